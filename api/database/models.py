@@ -7,7 +7,7 @@ from sqlalchemy import (
     UniqueConstraint, CheckConstraint, func, TIMESTAMP
 )
 from sqlalchemy.orm import DeclarativeBase, relationship
-from pgvector.sqlalchemy import Vector
+from pgvector.sqlalchemy import HALFVEC
 import enum
 from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
 
@@ -96,7 +96,7 @@ class Course(Base):
     name = Column(String(200), nullable=False)
     description = Column(String(500))
     keywords = Column(Text)
-    embedding = Column(Vector(EMBEDDING_DIM))
+    embedding = Column(HALFVEC(EMBEDDING_DIM))
     
     content = relationship("CourseContent", back_populates="course")
     sections = relationship("CourseSection", back_populates="course")
@@ -129,7 +129,7 @@ class UniversityDocument(Base):
     raw_content = Column(Text, nullable=False)
     summary = Column(Text)
     keywords = Column(Text)
-    keyword_embedding = Column(Vector(EMBEDDING_DIM))
+    keyword_embedding = Column(HALFVEC(EMBEDDING_DIM))
     
     chunks = relationship("DocumentChunk", back_populates="document")
 
@@ -141,7 +141,7 @@ class DocumentChunk(Base):
     document_id = Column(Integer, ForeignKey("university_documents.id"), nullable=False)
     chunk_index = Column(Integer, nullable=False)
     content = Column(Text, nullable=False)
-    embedding = Column(Vector(EMBEDDING_DIM))
+    embedding = Column(HALFVEC(EMBEDDING_DIM))
     
     document = relationship("UniversityDocument", back_populates="chunks")
 
@@ -312,7 +312,7 @@ class KnowledgeBase(Base):
     parent_category = Column(String(100))
 
     metadata_ = Column("metadata", JSONB, default={})
-    embedding = Column(Vector(EMBEDDING_DIM))
+    embedding = Column(HALFVEC(EMBEDDING_DIM))
 
     search_vector = Column(TSVECTOR)
 
@@ -345,7 +345,7 @@ class KnowledgeBaseEmbedding(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
     kb_id = Column(UUID(as_uuid=True), ForeignKey("knowledge_base.id", ondelete="CASCADE"), nullable=False, index=True)
     model_id = Column(Integer, ForeignKey("embedding_models.id", ondelete="CASCADE"), nullable=False, index=True)
-    embedding = Column(Vector(), nullable=False)
+    embedding = Column(HALFVEC(), nullable=False)
     created_at = Column(TIMESTAMP, server_default=func.now())
 
     kb_entry = relationship("KnowledgeBase", back_populates="versioned_embeddings")
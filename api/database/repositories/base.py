@@ -1,11 +1,20 @@
 from typing import Any, Generic, TypeVar
 
-from sqlalchemy import func, select
+from sqlalchemy import func, select, text
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 T = TypeVar("T")
 
+HNSW_MIN_EF_SEARCH = 40  # pgvector's default
+HNSW_MAX_EF_SEARCH = 1000  # pgvector rejects anything larger
+
+
+def set_hnsw_ef_search(db: Session, limit: int) -> None:
+    """Size the HNSW candidate list to the request (~2x limit) for the current transaction only."""
+    ef_search = min(HNSW_MAX_EF_SEARCH, max(HNSW_MIN_EF_SEARCH, 2 * limit))
+    db.execute(text("SELECT set_config('hnsw.ef_search', :ef_search, true)"), {"ef_search": str(ef_search)})
+
 
 class BaseRepository(Generic[T]):
     def __init__(self, session: Session, model: type[T]) -> None:
@@ -1,11 +1,22 @@
+from collections.abc import Iterator
+from dataclasses import dataclass
+
 from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
 
 from database.models import Course, CourseContent
+from .base import set_hnsw_ef_search
+
+
+@dataclass(frozen=True, slots=True)
+class CourseHit:
+    course: Course
+    distance: float
 
 
 class CourseRepository:
-    def vector_search(self, db: Session, query_embedding: list[float], limit: int = 5) -> list[Course]:
+    def vector_search(self, db: Session, query_embedding: list[float], limit: int = 5) -> list[CourseHit]:
+        set_hnsw_ef_search(db, limit)
         rows = (
             db.query(Course, Course.embedding.cosine_distance(query_embedding).label("distance"))
             .filter(Course.embedding.isnot(None))
@@ -13,12 +24,7 @@ class CourseRepository:
             .limit(limit)
             .all()
         )
-
-        courses: list[Course] = []
-        for course, distance in rows:
-            course.distance = distance
-            courses.append(course)
-        return courses
+        return [CourseHit(course, distance) for course, distance in rows]
 
     def get_by_code(self, db: Session, code: str) -> Course | None:
         return db.scalars(select(Course).where(Course.code == code)).first()
@@ -27,8 +33,15 @@ class CourseRepository:
         stmt = select(Course).where(Course.keywords.contains(keyword)).limit(limit)
         return list(db.scalars(stmt).all())
 
-    def get_courses_with_embeddings(self, db: Session) -> list[Course]:
-        return list(db.scalars(select(Course).where(Course.embedding.isnot(None))).all())
+    def get_courses_with_embeddings(self, db: Session) -> Iterator[Course]:
+        # yield_per streams through a server-side cursor, so memory stays flat
+        # no matter how many embedded courses exist.
+        stmt = (
+            select(Course)
+            .where(Course.embedding.isnot(None))
+            .execution_options(yield_per=500)
+        )
+        yield from db.scalars(stmt)
 
     def get_syllabus(self, db: Session, course_id: int) -> list[CourseContent]:
         stmt = (
@@ -1,7 +1,7 @@
 from sqlalchemy import select
 from sqlalchemy.orm import Session, joinedload
 
-from .base import BaseRepository
+from .base import BaseRepository, set_hnsw_ef_search
 from ..models import DocumentChunk, UniversityDocument
 
 
@@ -13,6 +13,7 @@ class DocumentRepository(BaseRepository[UniversityDocument]):
         return self.get_one_by(source_url=url)
 
     def search_by_keywords(self, query_vector: list[float], limit: int = 5) -> list[UniversityDocument]:
+        set_hnsw_ef_search(self.session, limit)
         stmt = (
             select(UniversityDocument)
             .order_by(UniversityDocument.keyword_embedding.cosine_distance(query_vector))
@@ -21,6 +22,7 @@ class DocumentRepository(BaseRepository[UniversityDocument]):
         return list(self.session.scalars(stmt).all())
 
     def search_chunks(self, query_vector: list[float], limit: int = 10) -> list[DocumentChunk]:
+        set_hnsw_ef_search(self.session, limit)
         stmt = (
             select(DocumentChunk)
             .order_by(DocumentChunk.embedding.cosine_distance(query_vector))
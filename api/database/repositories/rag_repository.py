@@ -1,10 +1,49 @@
 import re
 from typing import Any
 
-from sqlalchemy import or_, select, text
+from pgvector.sqlalchemy import HALFVEC
+from sqlalchemy import bindparam, func, or_, select, text
+from sqlalchemy.engine import RowMapping
 from sqlalchemy.orm import Session
 
-from database.models import KnowledgeBase
+from database.models import EMBEDDING_DIM, KnowledgeBase
+from .base import set_hnsw_ef_search
+
+
+# Columns for result lists that only show a preview; skips the full content/embedding payload.
+SNIPPET_CHARS = 240
+SUMMARY_COLUMNS = (
+    KnowledgeBase.id,
+    KnowledgeBase.title,
+    KnowledgeBase.url,
+    KnowledgeBase.type,
+    KnowledgeBase.metadata_.label("metadata"),
+    func.left(KnowledgeBase.content, SNIPPET_CHARS).label("snippet"),
+)
+
+# The summaries KNN as one static statement: no per-call ORM/Core statement building.
+# Filter params are inlined client-side by psycopg2, so "NULL IS NULL" branches fold away
+# and the planner still sees a plain ORDER BY embedding <-> ... LIMIT on the HNSW index.
+SUMMARY_KNN_SQL = text(f"""
+    SELECT id, title, url, type, metadata, left(content, {SNIPPET_CHARS}) AS snippet,
+           embedding <=> CAST(:embedding AS halfvec) AS distance
+    FROM knowledge_base
+    WHERE (CAST(:type AS text) IS NULL OR type = :type)
+      AND (CAST(:code AS text) IS NULL OR title ILIKE :code || '%')
+    ORDER BY embedding <-> CAST(:embedding AS halfvec)
+    LIMIT :limit
+""").bindparams(bindparam("embedding", type_=HALFVEC(EMBEDDING_DIM)))
+
+
+def _merge_by_id(rows: list[Any]) -> list[Any]:
+    seen: set[Any] = set()
+    merged: list[Any] = []
+    for row in rows:
+        if row.id in seen:
+            continue
+        seen.add(row.id)
+        merged.append(row)
+    return merged
 
 
 class RAGRepository:
@@ -16,44 +55,70 @@ class RAGRepository:
         filters: dict[str, Any] | None = None,
         limit: int = 10,
     ) -> list[KnowledgeBase]:
-        stmt = select(KnowledgeBase).order_by(KnowledgeBase.embedding.l2_distance(query_embedding))
-        if filters and filters.get("type"):
-            stmt = stmt.where(KnowledgeBase.type == filters["type"])
-        if filters and filters.get("code"):
-            stmt = stmt.where(KnowledgeBase.title.ilike(f"{filters['code']}%"))
-
+        set_hnsw_ef_search(db, limit)
+        stmt = self._vector_stmt(select(KnowledgeBase), query_embedding, filters)
         vector_rows = list(db.scalars(stmt.limit(limit)).all())
         keyword_rows = self._keyword_search(db, query_text=query_text, filters=filters, limit=limit)
+        return _merge_by_id(keyword_rows + vector_rows)
 
-        seen: set[Any] = set()
-        merged: list[KnowledgeBase] = []
-        for doc in keyword_rows + vector_rows:
-            if doc.id in seen:
-                continue
-            seen.add(doc.id)
-            merged.append(doc)
-        return merged
-
-    def _keyword_search(
+    def vector_search_summaries(
         self,
         db: Session,
-        query_text: str,
-        filters: dict[str, Any] | None,
-        limit: int,
-    ) -> list[KnowledgeBase]:
+        query_embedding: list[float],
+        query_text: str = "",
+        filters: dict[str, Any] | None = None,
+        limit: int = 10,
+    ) -> list[RowMapping]:
+        """Same hits as vector_search, as plain rows of SUMMARY_COLUMNS plus the cosine
+        "distance" to the query, instead of ORM objects."""
+        set_hnsw_ef_search(db, limit)
+        vector_rows = list(db.execute(SUMMARY_KNN_SQL, {
+            "embedding": query_embedding,
+            "type": (filters or {}).get("type") or None,
+            "code": (filters or {}).get("code") or None,
+            "limit": limit,
+        }))
+        columns = (*SUMMARY_COLUMNS, KnowledgeBase.embedding.cosine_distance(query_embedding).label("distance"))
+        keyword_stmt = self._keyword_stmt(select(*columns), query_text, filters)
+        keyword_rows = list(db.execute(keyword_stmt.limit(limit))) if keyword_stmt is not None else []
+        return [row._mapping for row in _merge_by_id(keyword_rows + vector_rows)]
+
+    @staticmethod
+    def _vector_stmt(stmt: Any, query_embedding: list[float], filters: dict[str, Any] | None) -> Any:
+        stmt = stmt.order_by(KnowledgeBase.embedding.l2_distance(query_embedding))
+        if filters and filters.get("type"):
+            stmt = stmt.where(KnowledgeBase.type == filters["type"])
+        if filters and filters.get("code"):
+            stmt = stmt.where(KnowledgeBase.title.ilike(f"{filters['code']}%"))
+        return stmt
+
+    @staticmethod
+    def _keyword_stmt(stmt: Any, query_text: str, filters: dict[str, Any] | None) -> Any | None:
         clean = re.sub(r"[^\w\s]", " ", query_text or "")
         words = [word for word in clean.split() if len(word) > 2]
         if not words:
-            return []
+            return None
 
         stmt = (
-            select(KnowledgeBase)
+            stmt
             .where(text("search_vector @@ to_tsquery('simple', :q)"))
             .order_by(text("ts_rank(search_vector, to_tsquery('simple', :q)) DESC"))
         )
         if filters and filters.get("type"):
             stmt = stmt.where(KnowledgeBase.type == filters["type"])
-        return list(db.scalars(stmt.params(q=" | ".join(words)).limit(limit)).all())
+        return stmt.params(q=" | ".join(words))
+
+    def _keyword_search(
+        self,
+        db: Session,
+        query_text: str,
+        filters: dict[str, Any] | None,
+        limit: int,
+    ) -> list[KnowledgeBase]:
+        stmt = self._keyword_stmt(select(KnowledgeBase), query_text, filters)
+        if stmt is None:
+            return []
+        return list(db.scalars(stmt.limit(limit)).all())
 
     def get_by_url(self, db: Session, url: str) -> list[KnowledgeBase]:
         return list(db.scalars(select(KnowledgeBase).where(KnowledgeBase.url == url).order_by(KnowledgeBase.id)).all())
@@ -27,6 +27,22 @@ engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 logger = get_logger(__name__)
 
+# ANN indexes for the distance operators the repositories order by; without
+# them every vector search is a sequential scan. The last field is the migration
+# that converts an existing column to the type the opclass needs.
+HNSW_INDEXES = (
+    ("courses_embedding_hnsw", "courses", "embedding", "halfvec_cosine_ops", "003_halfvec_embeddings.sql"),
+    ("university_documents_keyword_embedding_hnsw", "university_documents", "keyword_embedding", "halfvec_cosine_ops", "004_halfvec_knowledge_base.sql"),
+    ("document_chunks_embedding_hnsw", "document_chunks", "embedding", "halfvec_cosine_ops", "003_halfvec_embeddings.sql"),
+    ("knowledge_base_embedding_hnsw", "knowledge_base", "embedding", "halfvec_l2_ops", "004_halfvec_knowledge_base.sql"),
+)
+
+# create_all never alters existing columns, so check the live type before indexing.
+_COLUMN_TYPE_SQL = text(
+    "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+    "WHERE attrelid = to_regclass(:table) AND attname = :column AND NOT attisdropped"
+)
+
 
 def init_db() -> None:
     try:
@@ -34,6 +50,20 @@ def init_db() -> None:
             conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
             conn.commit()
         Base.metadata.create_all(bind=engine)
+        with engine.connect() as conn:
+            for name, table, column, ops, migration in HNSW_INDEXES:
+                column_type = conn.execute(_COLUMN_TYPE_SQL, {"table": table, "column": column}).scalar()
+                if column_type is None or not column_type.startswith(ops.split("_")[0] + "("):
+                    logger.warning(
+                        "Skipping %s: %s.%s is %s; run scripts/migrations/%s first",
+                        name, table, column, column_type, migration,
+                    )
+                    continue
+                conn.execute(text(
+                    f"CREATE INDEX IF NOT EXISTS {name} ON {table} "
+                    f"USING hnsw ({column} {ops}) WITH (m = 16, ef_construction = 64)"
+                ))
+            conn.commit()
         logger.info("Database initialized successfully")
     except SQLAlchemyError as exc:
         raise RuntimeError(f"Database initialization failed: {exc}") from exc
@@ -5,8 +5,20 @@ TEI_URL = (os.getenv("TEI_URL") or os.getenv("EMBEDDING_SERVICE_URL", "http://lo
 TEI_URLS_RAW = os.getenv("TEI_URLS", "")
 OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434").rstrip("/")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "all-minilm")
+LOCAL_MODEL = os.getenv("LOCAL_MODEL", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
 
 
 def select_tei_url() -> str:
     urls = [entry.strip().rstrip("/") for entry in TEI_URLS_RAW.split(",") if entry.strip()]
     return urls[0] if urls else TEI_URL
+
+
+def embedding_model_id() -> str:
+    """Provider plus model (or TEI endpoint) of the configured embeddings, for cache keys."""
+    if EMBEDDING_PROVIDER == "ollama":
+        return f"ollama:{OLLAMA_MODEL}"
+    if EMBEDDING_PROVIDER == "local":
+        return f"local:{LOCAL_MODEL}"
+    return f"{EMBEDDING_PROVIDER}:{select_tei_url()}"
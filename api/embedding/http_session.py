@@ -0,0 +1,30 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from embedding.config import EMBEDDING_CONCURRENCY
+
+# Process-wide cap on in-flight embedding HTTP requests. It is counted per request, not per
+# embed_batch call, because a batch can fan out into several requests (Ollama).
+_request_slots = threading.BoundedSemaphore(EMBEDDING_CONCURRENCY)
+
+
+class _LimitedSession(requests.Session):
+    def request(self, *args, **kwargs) -> requests.Response:
+        with _request_slots:
+            return super().request(*args, **kwargs)
+
+
+def pooled_session(pool_maxsize: int = 32) -> requests.Session:
+    # Keep-alive pool shared by all calls of one provider; retries only cover connection setup.
+    session = _LimitedSession()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=pool_maxsize,
+        max_retries=Retry(total=2, backoff_factor=0.1),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
@@ -1,16 +1,34 @@
+from functools import lru_cache
+
 from embedding.provider_base import EmbeddingProvider
 
+import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
 
+DEFAULT_LOCAL_MODEL = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+
+
+@lru_cache(maxsize=None)
+def get_local_model(model_name: str = DEFAULT_LOCAL_MODEL) -> SentenceTransformer:
+    # Loaded once per process; fp16 on GPU halves memory and bandwidth.
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    model = SentenceTransformer(model_name, device=device)
+    if device == "cuda":
+        model = model.half()
+    return model
+
+
 class LocalProvider(EmbeddingProvider):
-    def __init__(self, model_name: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2") -> None:
-        self.model = SentenceTransformer(model_name)
+    def __init__(self, model_name: str = DEFAULT_LOCAL_MODEL) -> None:
+        self.model = get_local_model(model_name)
 
-    def embed_text(self, text: str) -> list[float]:
-        return self.model.encode(text).tolist()
+    def embed_text(self, text: str) -> np.ndarray:
+        return np.asarray(self.model.encode(text), dtype=np.float32)
 
-    def embed_batch(self, texts: list[str]) -> list[list[float]]:
-        return self.model.encode(texts).tolist()
+    def embed_batch(self, texts: list[str]) -> np.ndarray:
+        # encode() already batches (32 texts per forward pass); just keep its tqdm bar out of server logs
+        return np.asarray(self.model.encode(texts, show_progress_bar=False), dtype=np.float32)
 
     def get_dimension(self) -> int:
-        return self.model.get_sentence_embedding_dimension()
\ No newline at end of file
+        return self.model.get_sentence_embedding_dimension()
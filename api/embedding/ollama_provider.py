@@ -1,22 +1,35 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import requests
 
+from embedding.http_session import pooled_session
 from embedding.provider_base import EmbeddingProvider
 
 
+# Ollama has no batch endpoint for /api/embeddings, so batches fan out over threads.
+# One pool per process: the benchmark rebuilds providers and would leak a pool each time.
+BATCH_WORKERS = 8
+_batch_pool = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="ollama-embed")
+
+
 class OllamaProvider(EmbeddingProvider):
+
     def __init__(self, api_url: str, model: str) -> None:
         self.api_url = api_url.rstrip("/")
         self.model = model
         self.dimension = 384
+        self.session = pooled_session()
         self._validate_connection()
 
     def _validate_connection(self) -> None:
         try:
-            requests.get(f"{self.api_url}/", timeout=5)
-            response = requests.post(
+            # (connect, read): fail fast on an unreachable host, allow a cold model load
+            self.session.get(f"{self.api_url}/", timeout=(1, 5))
+            response = self.session.post(
                 f"{self.api_url}/api/embeddings",
                 json={"model": self.model, "prompt": "test"},
-                timeout=10,
+                timeout=(1, 10),
             )
             if response.status_code == 404:
                 raise ValueError(f"Model {self.model} not found")
@@ -27,17 +40,18 @@ class OllamaProvider(EmbeddingProvider):
         except (requests.RequestException, ValueError, TypeError) as exc:
             raise ConnectionError(f"Ollama error: {exc}") from exc
 
-    def embed_text(self, text: str) -> list[float]:
-        response = requests.post(
+    def embed_text(self, text: str) -> np.ndarray:
+        response = self.session.post(
             f"{self.api_url}/api/embeddings",
             json={"model": self.model, "prompt": text, "options": {"temperature": 0}},
             timeout=30,
         )
         response.raise_for_status()
-        return response.json()["embedding"]
+        return np.asarray(response.json()["embedding"], dtype=np.float32)
 
-    def embed_batch(self, texts: list[str]) -> list[list[float]]:
-        return [self.embed_text(text) for text in texts]
+    def embed_batch(self, texts: list[str]) -> np.ndarray:
+        # map() keeps input order
+        return np.stack(list(_batch_pool.map(self.embed_text, texts)))
 
     def get_dimension(self) -> int:
         return self.dimension
@@ -1,13 +1,15 @@
 from abc import ABC, abstractmethod
 
+import numpy as np
+
 
 class EmbeddingProvider(ABC):
     @abstractmethod
-    def embed_text(self, text: str) -> list[float]:
+    def embed_text(self, text: str) -> np.ndarray:
         raise NotImplementedError
 
     @abstractmethod
-    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+    def embed_batch(self, texts: list[str]) -> np.ndarray:
         raise NotImplementedError
 
     @abstractmethod
@@ -1,12 +1,16 @@
-import os
 import threading
+from functools import lru_cache
 
-from embedding.config import EMBEDDING_PROVIDER, OLLAMA_MODEL, OLLAMA_URL, select_tei_url
+import numpy as np
+
+from embedding.config import EMBEDDING_CACHE_SIZE, EMBEDDING_PROVIDER, LOCAL_MODEL, OLLAMA_MODEL, OLLAMA_URL, select_tei_url
 from embedding.providers import EmbeddingProvider, OllamaProvider, TEIProvider, LocalProvider
 
 class EmbeddingService:
     def __init__(self) -> None:
         self.provider = self._create_provider()
+        # Per instance, so a new provider never serves vectors cached from the old one.
+        self._embed_cached = lru_cache(maxsize=EMBEDDING_CACHE_SIZE)(self._embed_uncached)
 
     @staticmethod
     def _create_provider() -> EmbeddingProvider:
@@ -15,16 +19,26 @@ class EmbeddingService:
         if EMBEDDING_PROVIDER == "tei":
             return TEIProvider(select_tei_url())
         if EMBEDDING_PROVIDER == "local":
-            model_name = os.getenv("LOCAL_MODEL", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
-            return LocalProvider(model_name)
+            return LocalProvider(LOCAL_MODEL)
         raise ValueError(f"Unknown embedding provider: {EMBEDDING_PROVIDER}")
 
-    def embed_text(self, text: str) -> list[float]:
+    def embed_text(self, text: str) -> np.ndarray:
         if not text or not text.strip():
             raise ValueError("Text cannot be empty")
-        return self.provider.embed_text(text)
+        return self._embed_cached(text)
+
+    def _embed_uncached(self, text: str) -> np.ndarray:
+        vector = np.asarray(self.provider.embed_text(text), dtype=np.float32)
+        vector.setflags(write=False)  # shared by every cache hit
+        return vector
+
+    def cache_info(self):
+        return self._embed_cached.cache_info()
+
+    def cache_clear(self) -> None:
+        self._embed_cached.cache_clear()
 
-    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+    def embed_batch(self, texts: list[str]) -> np.ndarray:
         if not texts:
             raise ValueError("Texts list cannot be empty")
         return self.provider.embed_batch(texts)
@@ -1,5 +1,7 @@
+import numpy as np
 import requests
 
+from embedding.http_session import pooled_session
 from embedding.provider_base import EmbeddingProvider
 
 
@@ -9,14 +11,15 @@ class TEIProvider(EmbeddingProvider):
     def __init__(self, api_url: str) -> None:
         self.api_url = api_url.rstrip("/")
         self.dimension = 384
+        self.session = pooled_session()
         self._validate_connection()
 
     def _validate_connection(self) -> None:
-        response = requests.post(f"{self.api_url}/embed", json={"inputs": "connection test"}, timeout=5)
+        response = self.session.post(f"{self.api_url}/embed", json={"inputs": "connection test"}, timeout=(1, 5))
         response.raise_for_status()
         self.dimension = len(response.json()[0])
 
-    def _embed_with_backoff(self, text: str, timeout: int = 10) -> list[float]:
+    def _embed_with_backoff(self, text: str, timeout: int = 10) -> np.ndarray:
         value = (text or "").strip()
         if not value:
             raise ValueError("Text cannot be empty")
@@ -30,9 +33,9 @@ class TEIProvider(EmbeddingProvider):
                 continue
             tried.add(candidate)
             try:
-                response = requests.post(f"{self.api_url}/embed", json={"inputs": candidate}, timeout=timeout)
+                response = self.session.post(f"{self.api_url}/embed", json={"inputs": candidate}, timeout=timeout)
                 response.raise_for_status()
-                return response.json()[0]
+                return np.asarray(response.json()[0], dtype=np.float32)
             except requests.exceptions.HTTPError as exc:
                 if exc.response is not None and exc.response.status_code == 413:
                     last_413 = exc
@@ -43,21 +46,21 @@ class TEIProvider(EmbeddingProvider):
             raise RuntimeError(f"TEI kept returning 413 after truncation to {self.SAFE_CHAR_LIMITS[-1]} chars") from last_413
         raise RuntimeError("TEI embedding failed")
 
-    def embed_text(self, text: str) -> list[float]:
+    def embed_text(self, text: str) -> np.ndarray:
         return self._embed_with_backoff(text)
 
-    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+    def embed_batch(self, texts: list[str]) -> np.ndarray:
         cleaned = [(text or "").strip() for text in texts]
         cap = self.SAFE_CHAR_LIMITS[0]
         short = [value if len(value) <= cap else value[:cap] for value in cleaned]
 
         try:
-            response = requests.post(f"{self.api_url}/embed", json={"inputs": short}, timeout=30)
+            response = self.session.post(f"{self.api_url}/embed", json={"inputs": short}, timeout=30)
             response.raise_for_status()
-            return response.json()
+            return np.asarray(response.json(), dtype=np.float32)
         except requests.exceptions.HTTPError as exc:
             if exc.response is not None and exc.response.status_code == 413:
-                return [self._embed_with_backoff(value) for value in cleaned]
+                return np.stack([self._embed_with_backoff(value) for value in cleaned])
             raise
 
     def get_dimension(self) -> int:
@@ -3,7 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 
 from core.logging import get_logger
 from database.models import (
@@ -77,6 +77,14 @@ class EventPipelineOrchestrator:
                 payload={"source_count": len(sources), "processable_sources": processable_sources},
             )
             db.commit()
+            # Content-hash checkpoints for this batch in one query; unchanged sources skip re-extraction
+            checkpointed_keys = set(
+                db.scalars(
+                    select(EventSourceCheckpoint.source_key).where(
+                        EventSourceCheckpoint.source_key.in_([s.source_key for s in sources if s.should_process])
+                    )
+                )
+            )
             for source in sources:
                 if source.source_key in in_memory_seen:
                     self._log_source(db, run.id, source, EventSourceStatus.SKIPPED, "seen_in_memory")
@@ -113,8 +121,7 @@ class EventPipelineOrchestrator:
                     db.commit()
                     continue
 
-                checkpoint = db.get(EventSourceCheckpoint, source.source_key)
-                if checkpoint is not None:
+                if source.source_key in checkpointed_keys:
                     self._log_source(db, run.id, source, EventSourceStatus.SKIPPED, "checkpoint_exists")
                     self._emit_agent_log(
                         db=db,
@@ -98,7 +98,7 @@ class ReasoningReviewer:
 
     def _review_once(self, candidates: list[dict[str, str]]) -> list[dict[str, object]]:
         prompt = self._build_prompt(candidates)
-        raw = "".join(self._llm.generate(prompt))
+        raw = self._llm.generate_full(prompt)
         return self._parse_json_array(raw)
 
     @staticmethod
@@ -1,24 +1,50 @@
 from collections.abc import Iterator
-from typing import Protocol
-
-import google.generativeai as genai
-from openai import OpenAI
+from functools import lru_cache
+from typing import TYPE_CHECKING, Protocol
 
 from rag.config import RAG_LLM_MAX_TOKENS
 
+# SDKs are imported on first use: only the configured provider's import chain
+# (protobuf/grpc for Gemini, httpx/openai otherwise) is paid at worker boot.
+if TYPE_CHECKING:
+    import google.generativeai as genai
+    from openai import OpenAI
+
 
 class LLMProvider(Protocol):
-    def stream(self, prompt: str) -> Iterator[str]: ...
+    def stream(self, prompt: str, system: str | None = None) -> Iterator[str]: ...
+
+    def complete(self, prompt: str, system: str | None = None) -> str: ...
+
+
+@lru_cache(maxsize=None)
+def _configure_gemini(api_key: str) -> None:
+    import google.generativeai as genai
+
+    # genai.configure is process-global; doing it once per key is enough.
+    genai.configure(api_key=api_key)
+
+
+@lru_cache(maxsize=16)
+def _gemini_model(model: str, system: str | None = None) -> "genai.GenerativeModel":
+    import google.generativeai as genai
+
+    # Shared by every LLMService instance. The system instruction is part of the
+    # model config, so each distinct system prompt gets its own model.
+    return genai.GenerativeModel(model, system_instruction=system)
 
 
 class GeminiProvider:
     def __init__(self, model: str, api_key: str) -> None:
         self.model = model
-        genai.configure(api_key=api_key)
-        self.client = genai.GenerativeModel(model)
+        _configure_gemini(api_key)
+        self.client = _gemini_model(model)
 
-    def stream(self, prompt: str) -> Iterator[str]:
-        for chunk in self.client.generate_content(
+    def _client_for(self, system: str | None) -> "genai.GenerativeModel":
+        return _gemini_model(self.model, system)
+
+    def stream(self, prompt: str, system: str | None = None) -> Iterator[str]:
+        for chunk in self._client_for(system).generate_content(
             prompt,
             stream=True,
             generation_config={"max_output_tokens": RAG_LLM_MAX_TOKENS},
@@ -27,16 +53,44 @@ class GeminiProvider:
             if text:
                 yield text
 
+    def complete(self, prompt: str, system: str | None = None) -> str:
+        response = self._client_for(system).generate_content(
+            prompt,
+            generation_config={"max_output_tokens": RAG_LLM_MAX_TOKENS},
+        )
+        return response.text
+
+
+@lru_cache(maxsize=None)
+def _openai_client(api_key: str, base_url: str | None) -> "OpenAI":
+    import httpx
+    from openai import OpenAI
+
+    # One client (and keep-alive pool) per endpoint for the whole process,
+    # so every LLMService instance reuses warm TLS connections.
+    http_client = httpx.Client(
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+        timeout=httpx.Timeout(60.0, connect=5.0),
+    )
+    return OpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+
 
 class OpenAICompatProvider:
     def __init__(self, model: str, api_key: str, base_url: str | None = None) -> None:
         self.model = model
-        self.client = OpenAI(api_key=api_key, base_url=base_url)
+        self.client = _openai_client(api_key, base_url)
 
-    def stream(self, prompt: str) -> Iterator[str]:
+    @staticmethod
+    def _messages(prompt: str, system: str | None) -> list[dict[str, str]]:
+        # System first: OpenAI caches identical prompt prefixes automatically.
+        messages = [{"role": "system", "content": system}] if system else []
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    def stream(self, prompt: str, system: str | None = None) -> Iterator[str]:
         chunks = self.client.chat.completions.create(
             model=self.model,
-            messages=[{"role": "user", "content": prompt}],
+            messages=self._messages(prompt, system),
             stream=True,
             max_tokens=RAG_LLM_MAX_TOKENS,
         )
@@ -44,3 +98,11 @@ class OpenAICompatProvider:
             text = chunk.choices[0].delta.content
             if text:
                 yield text
+
+    def complete(self, prompt: str, system: str | None = None) -> str:
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=self._messages(prompt, system),
+            max_tokens=RAG_LLM_MAX_TOKENS,
+        )
+        return response.choices[0].message.content or ""
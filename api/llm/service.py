@@ -44,13 +44,21 @@ class LLMService:
         self.provider = provider
         logger.info("LLM provider configured: %s (%s)", self.provider, self.model_name)
 
-    def generate(self, prompt: str) -> Iterator[str]:
+    def generate(self, prompt: str, system: str | None = None) -> Iterator[str]:
         try:
-            yield from self._client.stream(prompt)
+            yield from self._client.stream(prompt, system)
         except Exception as exc:
             logger.exception("LLM generation failed")
             yield f"[Error: {exc}]"
 
+    def generate_full(self, prompt: str, system: str | None = None) -> str:
+        """Non-streaming variant for callers that only need the final text."""
+        try:
+            return self._client.complete(prompt, system)
+        except Exception as exc:
+            logger.exception("LLM generation failed")
+            return f"[Error: {exc}]"
+
 
 def get_llm_service() -> LLMService:
     return LLMService()
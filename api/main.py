@@ -2,6 +2,9 @@ from dotenv import load_dotenv
 
 load_dotenv(".env")
 
+import asyncio
+from contextlib import asynccontextmanager
+
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -12,15 +15,25 @@ from routes.auth import router as auth_router
 from routes.events import router as events_router
 from routes.logout import router as logout_router
 from routes.search import router as search_router
+from routes.search import warm_up as warm_up_search
 from routes.sis import router as sis_router
 
 configure_logging()
 logger = get_logger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Provider connection checks are blocking HTTP calls
+    await asyncio.to_thread(warm_up_search)
+    yield
+
+
 app = FastAPI(
     title="UniChatBot API",
     description="University Chatbot API with JWT authentication and role support",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
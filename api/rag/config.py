@@ -7,6 +7,10 @@ RAG_TOP_K = int(os.getenv("RAG_TOP_K", "30"))
 RAG_FINAL_K = int(os.getenv("RAG_FINAL_K", "10"))
 RAG_PARALLEL_MODE = os.getenv("RAG_PARALLEL_MODE", "true").lower() in {"1", "true", "yes", "on"}
 
+# /search response cache (0 disables)
+RAG_SEARCH_CACHE_SIZE = int(os.getenv("RAG_SEARCH_CACHE_SIZE", "1024"))
+RAG_SEARCH_CACHE_TTL = float(os.getenv("RAG_SEARCH_CACHE_TTL", "300"))
+
 # Reranker
 RAG_RERANK_MODEL = os.getenv("RAG_RERANK_MODEL", "jina-reranker-v2-base-multilingual")
 
@@ -52,7 +52,9 @@ OUTPUT JSON ONLY.
 """.strip()
 
 
-ANSWER_PROMPT_TEMPLATE = """
+# Static instructions go in the system message so providers can reuse the cached prefix;
+# only ANSWER_PROMPT_TEMPLATE changes per request.
+ANSWER_SYSTEM_PROMPT = """
 You are a knowledgeable and helpful academic assistant for Istanbul Bilgi University.
 
 # INSTRUCTIONS
@@ -82,7 +84,10 @@ You are a knowledgeable and helpful academic assistant for Istanbul Bilgi Univer
     - When BOTH sections are present and the user asks about conflicts (e.g. "do my classes
       overlap with holidays?"), cross-reference them explicitly — list each conflict found,
       or confirm there are none.
+""".strip()
 
+
+ANSWER_PROMPT_TEMPLATE = """
 ### USER QUESTION:
 {query}
 
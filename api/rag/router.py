@@ -18,7 +18,7 @@ def _default_intent(query: str) -> list[dict[str, Any]]:
 
 
 def route_query(llm_service: Any, query: str) -> list[dict[str, Any]]:
-    raw = "".join(llm_service.generate(f"{ROUTER_PROMPT}\nUser: {query}"))
+    raw = llm_service.generate_full(f"User: {query}", system=ROUTER_PROMPT)
     cleaned = raw.replace("```json", "").replace("```", "").strip()
 
     try:
@@ -1,5 +1,6 @@
 import time
 from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from typing import Any
 
 from rich import box
@@ -10,39 +11,53 @@ from core.logging import get_logger
 from database.models import User
 from database.repositories.rag_repository import get_rag_repository
 from llm.service import get_llm_service
-from rag.config import RAG_PARALLEL_MODE, RAG_STREAM_ENABLED
+from rag.config import RAG_PARALLEL_MODE, RAG_SEARCH_CACHE_SIZE, RAG_SEARCH_CACHE_TTL, RAG_STREAM_ENABLED
 from rag.console import RAG_DEBUG, console
-from rag.constants import ANSWER_PROMPT_TEMPLATE
+from rag.constants import ANSWER_PROMPT_TEMPLATE, ANSWER_SYSTEM_PROMPT
 from rag.context import build_context, deduplicate_docs, render_debug_table
-from rag.context_injectors import build_sis_context
-from rag.helpers import doc_meta
+from rag.context_injectors import SIS_TOOLS, build_sis_context
 from rag.retrieval import RetrievalEngine
 from rag.router import route_query
+from rag.search_cache import TTLCache, normalize_query
 from services.embedding_service import get_embedding_service
 from sqlalchemy.orm import Session
 
 logger = get_logger(__name__)
 
 
+_COURSE_CONTEXT = "Source: {title}\nURL: {url}\nContent: {snippet}".format
+_NO_COURSES_PROMPT = "The user asked: {query}. No matching courses were found. Respond helpfully and suggest refining the query.".format
+
+# Stage timings only feed the RAG_DEBUG panel; production requests skip the clock reads.
+_clock = time.perf_counter_ns if RAG_DEBUG else (lambda: 0)
+
+# Embeds routed vector queries side by side instead of one per serial retrieval step.
+_prefetch_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rag-prefetch")
+
+
 class RAGService:
     def __init__(self) -> None:
         self.embedding_service = get_embedding_service()
         self.repository = get_rag_repository()
         self.llm_service = get_llm_service()
         self.retrieval = RetrievalEngine(self.embedding_service, self.repository)
+        self.search_cache = TTLCache(RAG_SEARCH_CACHE_SIZE, RAG_SEARCH_CACHE_TTL)
 
     def process_query(self, query: str, session: Session, current_user: User | None = None) -> Iterator[str]:
-        t_start = time.perf_counter()
+        t_start = _clock()
 
         intents = route_query(self.llm_service, query)
+        # Retrieval then finds these in the embedding cache; they overlap the SIS lookups too.
+        prefetches = self._prefetch_embeddings(intents)
         sis_context, intents = build_sis_context(intents, current_user, session)
-        t_routed = time.perf_counter()
+        wait(prefetches)
+        t_routed = _clock()
 
         parallel_mode = RAG_PARALLEL_MODE and len(intents) > 1
         docs: list[Any] = []
         for intent in intents:
             docs.extend(self.retrieval.execute_intent(session, intent, parallel_mode=parallel_mode))
-        t_retrieved = time.perf_counter()
+        t_retrieved = _clock()
 
         context_docs = deduplicate_docs(docs)
         render_debug_table(intents, context_docs)
@@ -59,21 +74,20 @@ class RAGService:
         prompt = ANSWER_PROMPT_TEMPLATE.format(query=query, context=context)
 
         if RAG_STREAM_ENABLED:
-            yield from self.llm_service.generate(prompt)
+            yield from self.llm_service.generate(prompt, system=ANSWER_SYSTEM_PROMPT)
         else:
-            full_response = "".join(self.llm_service.generate(prompt))
-            yield full_response
+            yield self.llm_service.generate_full(prompt, system=ANSWER_SYSTEM_PROMPT)
 
-        t_end = time.perf_counter()
+        t_end = _clock()
 
         if RAG_DEBUG:
             table = Table(box=box.SIMPLE, show_header=False)
             table.add_column("Stage", style="dim")
             table.add_column("Duration", style="bold green", justify="right")
-            table.add_row("Routing", f"{(t_routed - t_start) * 1000:.0f}ms")
-            table.add_row("Retrieval", f"{(t_retrieved - t_routed) * 1000:.0f}ms")
-            table.add_row("LLM stream", f"{(t_end - t_retrieved) * 1000:.0f}ms")
-            table.add_row("Total", f"{(t_end - t_start) * 1000:.0f}ms")
+            table.add_row("Routing", f"{(t_routed - t_start) // 1_000_000}ms")
+            table.add_row("Retrieval", f"{(t_retrieved - t_routed) // 1_000_000}ms")
+            table.add_row("LLM stream", f"{(t_end - t_retrieved) // 1_000_000}ms")
+            table.add_row("Total", f"{(t_end - t_start) // 1_000_000}ms")
             console.print(Panel(
                 table,
                 title="[dim]Query complete[/dim]",
@@ -81,15 +95,47 @@ class RAGService:
                 box=box.SIMPLE,
             ))
 
+    def _prefetch_embeddings(self, intents: list[dict[str, Any]]) -> list[Future]:
+        tools = [str(intent.get("tool", "vector")).lower() for intent in intents]
+        queries = [
+            query
+            for query in dict.fromkeys(str(intent.get("query", "")).strip() for intent, tool in zip(intents, tools) if tool == "vector")
+            if query
+        ]
+        # A lone vector query with no SIS lookup to overlap is cheaper to embed inline.
+        if len(queries) < 2 and not SIS_TOOLS.intersection(tools):
+            return []
+        return [_prefetch_pool.submit(self._prefetch_embedding, query) for query in queries]
+
+    def _prefetch_embedding(self, query: str) -> None:
+        try:
+            self.embedding_service.embed_text(query)
+        except Exception:
+            # Retrieval embeds it again and surfaces the error
+            logger.debug("Query embedding prefetch failed", exc_info=True)
+
     def search_courses(
         self,
         query: str,
         session: Session,
         limit: int = 5,
     ) -> tuple[list[dict[str, Any]], dict[str, float]]:
-        start = time.perf_counter()
+        # timings_ms is part of the /search response, so this clock always runs
+        start = time.perf_counter_ns()
+        results = self._course_results(query, session, limit)
+        timings = {"total": round((time.perf_counter_ns() - start) / 1_000_000, 2)}
+        return results, timings
+
+    def _course_results(self, query: str, session: Session, limit: int) -> list[dict[str, Any]]:
+        """Course hits shared by /search and /ask; callers always get their own dict copies."""
+        cache_key = (normalize_query(query), limit)
+        cached = self.search_cache.get(cache_key)
+        if cached is not None:
+            return [dict(result) for result in cached]
+
         query_embedding = self.embedding_service.embed_text(query)
-        docs = self.repository.vector_search(
+        # Plain rows with a DB-side snippet: no ORM state, and no full content/embedding transfer
+        rows = self.repository.vector_search_summaries(
             session,
             query_embedding=query_embedding,
             query_text=query,
@@ -97,23 +143,21 @@ class RAGService:
             limit=max(1, limit),
         )
 
-        results: list[dict[str, Any]] = []
-        for doc in docs:
-            meta = doc_meta(doc)
-            results.append(
-                {
-                    "id": str(doc.id),
-                    "title": doc.title,
-                    "url": getattr(doc, "url", None),
-                    "code": meta.get("course_code"),
-                    "type": doc.type,
-                    "score": float(getattr(doc, "score", 0.0)),
-                    "snippet": (doc.content or "")[:240],
-                }
-            )
-
-        timings = {"total": round((time.perf_counter() - start) * 1000, 2)}
-        return results, timings
+        results: list[dict[str, Any]] = [
+            {
+                "id": str(row["id"]),
+                "title": row["title"],
+                "url": row["url"],
+                "code": (row["metadata"] or {}).get("course_code"),
+                "type": row["type"],
+                "score": 1.0 - row["distance"] if row["distance"] is not None else 0.0,
+                "snippet": row["snippet"] or "",
+            }
+            for row in rows
+        ]
+
+        self.search_cache.set(cache_key, tuple(dict(result) for result in results))
+        return results
 
     def stream_answer(
         self,
@@ -121,15 +165,16 @@ class RAGService:
         session: Session,
         limit: int = 5,
     ) -> tuple[Iterator[str], list[dict[str, Any]]]:
-        courses, _ = self.search_courses(query=query, session=session, limit=limit)
+        courses = self._course_results(query, session, limit)
 
         if courses:
             context = "\n\n".join(
-                f"Source: {course['title']}\nURL: {course.get('url') or 'N/A'}\nContent: {course.get('snippet') or ''}"
+                _COURSE_CONTEXT(title=course["title"], url=course.get("url") or "N/A", snippet=course.get("snippet") or "")
                 for course in courses
             )
-            prompt = ANSWER_PROMPT_TEMPLATE.format(query=query, context=context)
-        else:
-            prompt = f"The user asked: {query}. No matching courses were found. Respond helpfully and suggest refining the query."
+            return self.llm_service.generate(
+                ANSWER_PROMPT_TEMPLATE.format(query=query, context=context),
+                system=ANSWER_SYSTEM_PROMPT,
+            ), courses
 
-        return self.llm_service.generate(prompt), courses
\ No newline at end of file
+        return self.llm_service.generate(_NO_COURSES_PROMPT(query=query)), courses
\ No newline at end of file
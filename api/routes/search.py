@@ -1,10 +1,14 @@
-import json
-from typing import AsyncIterator
+import asyncio
+from contextlib import aclosing, suppress
+from typing import AsyncGenerator, AsyncIterator
 
+import anyio
+import orjson
 from fastapi import APIRouter, Depends
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 
 from core.logging import get_logger
 from database.models import User
@@ -16,6 +20,10 @@ router = APIRouter()
 logger = get_logger(__name__)
 rag: RAGService | None = None
 
+# /ask token micro-batching: flush once this many bytes or this much time have piled up.
+SSE_FLUSH_BYTES = 256
+SSE_FLUSH_SECONDS = 0.02
+
 
 def _get_rag() -> RAGService:
     global rag
@@ -25,6 +33,67 @@ def _get_rag() -> RAGService:
     return rag
 
 
+def warm_up() -> None:
+    """Build the RAG service (and its embedding/LLM singletons) before the first request."""
+    try:
+        _get_rag()
+    except Exception as exc:
+        # Leave it to the first request, which retries and surfaces the error.
+        logger.warning("RAG service warm-up failed: %s", exc)
+
+
+def _sse(payload: dict[str, object]) -> bytes:
+    # orjson returns UTF-8 bytes, so StreamingResponse sends them without re-encoding.
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+
+def _sse_chunk(text: str) -> bytes:
+    # Per-token hot path: only the text needs encoding, the envelope is constant.
+    return b'data: {"type":"chunk","text":' + orjson.dumps(text) + b"}\n\n"
+
+
+async def _coalesce(chunks: AsyncGenerator[str, None]) -> AsyncIterator[bytes]:
+    """SSE chunk events, batched: the first token goes out alone, later ones are flushed
+    once SSE_FLUSH_BYTES pile up or SSE_FLUSH_SECONDS after the oldest unsent token."""
+    loop = asyncio.get_running_loop()
+    buffer = bytearray()
+    deadline: float | None = None
+    first = True
+    # The pending read is a task so a deadline flush doesn't cancel it (and drop its token).
+    pending = asyncio.ensure_future(anext(chunks))
+    try:
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+            if not done:
+                yield bytes(buffer)
+                buffer.clear()
+                deadline = None
+                continue
+            try:
+                chunk = pending.result()
+            except StopAsyncIteration:
+                break
+            pending = asyncio.ensure_future(anext(chunks))
+            buffer += _sse_chunk(chunk)
+            if first or len(buffer) >= SSE_FLUSH_BYTES:
+                yield bytes(buffer)
+                buffer.clear()
+                deadline = None
+                first = False
+            elif deadline is None:
+                deadline = loop.time() + SSE_FLUSH_SECONDS
+        if buffer:
+            yield bytes(buffer)
+    finally:
+        pending.cancel()
+        # Shielded: on a client disconnect this runs inside an already-cancelled scope
+        with anyio.CancelScope(shield=True):
+            with suppress(BaseException):
+                await pending
+            await chunks.aclose()
+
+
 class ChatRequest(BaseModel):
     message: str
 
@@ -48,7 +117,8 @@ async def search_courses(
     db: Session = Depends(get_db),
     _current_user: User = Depends(get_current_active_user),
 ) -> dict[str, object]:
-    results, timings = _get_rag().search_courses(q, db, limit)
+    # Embedding HTTP call + sync SQLAlchemy query: keep them off the event loop.
+    results, timings = await run_in_threadpool(_get_rag().search_courses, q, db, limit)
     return {
         "query": q,
         "results": results,
@@ -64,13 +134,21 @@ async def ask_courses(
     db: Session = Depends(get_db),
     _current_user: User = Depends(get_current_active_user),
 ) -> StreamingResponse:
-    stream, courses = _get_rag().stream_answer(q, db, limit)
+    stream, courses = await run_in_threadpool(_get_rag().stream_answer, q, db, limit)
 
-    async def generate() -> AsyncIterator[str]:
-        yield f"data: {json.dumps({'type': 'courses', 'query': q, 'courses': courses, 'count': len(courses)})}\n\n"
-        for chunk in stream:
-            yield f"data: {json.dumps({'type': 'chunk', 'text': chunk})}\n\n"
-        yield f"data: {json.dumps({'type': 'done'})}\n\n"
+    async def generate() -> AsyncIterator[bytes]:
+        try:
+            yield _sse({"type": "courses", "query": q, "courses": courses, "count": len(courses)})
+            # The LLM stream blocks on network reads; pull it from the threadpool, not the event loop.
+            async with aclosing(_coalesce(iterate_in_threadpool(stream))) as batches:
+                async for data in batches:
+                    yield data
+            yield _sse({"type": "done"})
+        finally:
+            # Stop the upstream LLM request now rather than whenever the generator is collected
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
 
     return StreamingResponse(
         generate(),
@@ -1,8 +1,10 @@
 import sys
 import os
+import json
+import time
 import psycopg2
+from pgvector.psycopg2 import register_vector
 from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer
 from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeRemainingColumn, MofNCompleteColumn
 from rich.console import Console
 
@@ -10,6 +12,8 @@ from rich.console import Console
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(BASE_DIR)
 
+from embedding.local_provider import DEFAULT_LOCAL_MODEL, get_local_model
+
 load_dotenv()
 
 # Config
@@ -22,6 +26,9 @@ DB_PARAMS = {
 }
 
 BATCH_SIZE = 50
+CANDIDATE_ENCODE_BATCH_SIZES = (4, 8, 16, 32, 64)
+DEFAULT_ENCODE_BATCH_SIZE = 16  # used when there are no rows to time
+BATCH_SIZE_CACHE = os.path.join(BASE_DIR, ".ingest_cache", "batch_size.json")
 console = Console()
 
 def get_db_connection():
@@ -31,8 +38,41 @@ def get_db_connection():
         console.print(f"[bold red]❌ Database Connection Failed:[/bold red] {e}")
         sys.exit(1)
 
+def tune_encode_batch_size(model, model_name, sample_texts):
+    """Times encode() on real rows for each candidate batch size and returns the fastest (cached per model and device)."""
+    if not sample_texts:
+        return DEFAULT_ENCODE_BATCH_SIZE
+
+    # A size tuned for fp16 on GPU is meaningless on CPU, so the device and dtype are part of the key
+    cache_key = f"{model_name}|{model.device}|{next(model.parameters()).dtype}"
+
+    cache = {}
+    if os.path.exists(BATCH_SIZE_CACHE):
+        with open(BATCH_SIZE_CACHE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    if cache_key in cache:
+        return cache[cache_key]
+
+    sample = (sample_texts * (64 // len(sample_texts) + 1))[:64]
+    model.encode(sample[:4], show_progress_bar=False)  # warm-up, keeps one-off init out of the timings
+
+    best_time, best_size = float("inf"), DEFAULT_ENCODE_BATCH_SIZE
+    for size in CANDIDATE_ENCODE_BATCH_SIZES:
+        start = time.perf_counter()
+        model.encode(sample, batch_size=size, show_progress_bar=False)
+        elapsed = time.perf_counter() - start
+        if elapsed < best_time:
+            best_time, best_size = elapsed, size
+
+    cache[cache_key] = best_size
+    os.makedirs(os.path.dirname(BATCH_SIZE_CACHE), exist_ok=True)
+    with open(BATCH_SIZE_CACHE, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2)
+    return best_size
+
 def generate_embeddings():
     conn = get_db_connection()
+    register_vector(conn)  # ndarray rows are sent as vector text without a tolist() copy
     cursor = conn.cursor()
 
     try:
@@ -50,8 +90,9 @@ def generate_embeddings():
 
         # 2. Load Model
         console.print("[yellow]⏳ Loading Embedding Model (this takes a few seconds)...[/yellow]")
-        model = SentenceTransformer('sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2')
+        model = get_local_model(DEFAULT_LOCAL_MODEL)
         console.print("[green]✅ Model ready.[/green]")
+        encode_batch_size = None
 
         # 3. Process with Progress Bar
         with Progress(
@@ -101,16 +142,24 @@ def generate_embeddings():
                     texts_to_embed.append(text)
                     ids_to_update.append(row_id)
 
+                # Pick the fastest encode batch size once, on the first page of real rows
+                if encode_batch_size is None:
+                    encode_batch_size = tune_encode_batch_size(model, DEFAULT_LOCAL_MODEL, texts_to_embed)
+                    progress.console.print(f"[dim]   Encode batch size: {encode_batch_size}[/dim]")
+
                 # Generate Vectors
-                embeddings = model.encode(texts_to_embed)
+                embeddings = model.encode(
+                    texts_to_embed,
+                    batch_size=encode_batch_size,
+                    convert_to_numpy=True,
+                    show_progress_bar=False,
+                )
 
                 # Update DB
-                update_data = []
-                for i, emb in enumerate(embeddings):
-                    update_data.append((emb.tolist(), ids_to_update[i]))
+                update_data = list(zip(embeddings, ids_to_update))
 
                 cursor.executemany(
-                    "UPDATE knowledge_base SET embedding = %s::vector WHERE id = %s",
+                    "UPDATE knowledge_base SET embedding = %s WHERE id = %s",
                     update_data
                 )
                 conn.commit() # Save progress after every batch
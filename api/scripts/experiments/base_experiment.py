@@ -3,16 +3,32 @@ Base class for all RAG experiments.
 Provides minimal utilities - experiments handle their own logic.
 """
 
-import json
+import hashlib
 import random
+from contextlib import contextmanager
 from pathlib import Path
 from typing import List, Dict
 from abc import ABC, abstractmethod
-from sqlalchemy.orm import Session
+import orjson
+from sqlalchemy import text
+from sqlalchemy.orm import Session, joinedload
 from database.models import UniversityDocument, DocumentChunk
+from embedding.config import embedding_model_id
 from llm.service import LLMService
 
 
+def _dumps(data, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes (numpy arrays included)."""
+    option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+    return orjson.dumps(data, option=option)
+
+
+# Rows are restored in id order after RESTART IDENTITY, so chunk ids come back unchanged.
+CHUNK_COPY_COLUMNS = "document_id, chunk_index, content, embedding"
+# Bump when chunk_document's splitting changes, so old dumps stop matching.
+CHUNKER_VERSION = 1
+
+
 class BaseExperiment(ABC):
     """Base class for RAG system experiments. Only provides utility methods."""
     
@@ -25,53 +41,136 @@ class BaseExperiment(ABC):
     
     def delete_all_chunks(self):
         """Delete all existing chunks from the database."""
-        count = self.db.query(DocumentChunk).count()
-        self.db.query(DocumentChunk).delete()
+        # TRUNCATE drops the table's files instead of deleting row by row;
+        # the planner estimate is enough for the log line.
+        estimate = self.db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE relname = 'document_chunks'")
+        ).scalar()
+        self.db.execute(text("TRUNCATE TABLE document_chunks RESTART IDENTITY"))
         self.db.commit()
-        print(f"Deleted {count} existing chunks")
+        print(f"Deleted ~{max(estimate or 0, 0)} existing chunks")
         
     def chunk_all_documents(self, chunk_size: int, overlap: int) -> int:
         """Chunk all documents with given strategy."""
         from regulations.engine import RegulationEngine
         
         engine = RegulationEngine(self.db)
-        docs = self.db.query(UniversityDocument).all()
+        doc_ids = [doc_id for (doc_id,) in self.db.query(UniversityDocument.id)]
         
         total_chunks = 0
-        for doc in docs:
-            count = engine.chunk_document(doc.id, chunk_size=chunk_size, overlap=overlap)
+        for doc_id in doc_ids:
+            count = engine.chunk_document(doc_id, chunk_size=chunk_size, overlap=overlap)
             total_chunks += count
             
         print(f"Created {total_chunks} chunks (size={chunk_size}, overlap={overlap})")
         return total_chunks
         
+    def _chunk_cache_path(self, chunk_size: int, overlap: int) -> Path:
+        """Cache file keyed by chunker, embedding model, chunking config and every document's content."""
+        # The dump carries embeddings, so a different provider/model must miss the cache
+        key = f"{CHUNKER_VERSION}:{embedding_model_id()}:{chunk_size}:{overlap}"
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16)
+        rows = self.db.execute(
+            text("SELECT id, md5(raw_content) FROM university_documents ORDER BY id")
+        )
+        for doc_id, content_md5 in rows:
+            digest.update(f"|{doc_id}:{content_md5}".encode("utf-8"))
+        return self.output_dir / f"chunks_{digest.hexdigest()}.copy"
+
+    def load_or_chunk_documents(self, chunk_size: int, overlap: int) -> int:
+        """Reset document_chunks for this config, restoring a COPY dump when one exists."""
+        cache_path = self._chunk_cache_path(chunk_size, overlap)
+        self.delete_all_chunks()
+
+        cursor = self.db.connection().connection.cursor()
+        if cache_path.exists():
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cursor.copy_expert(f"COPY document_chunks ({CHUNK_COPY_COLUMNS}) FROM STDIN", f)
+            self.db.commit()
+            total_chunks = cursor.rowcount
+            print(f"Restored {total_chunks} chunks from {cache_path.name} (size={chunk_size}, overlap={overlap})")
+            return total_chunks
+
+        total_chunks = self.chunk_all_documents(chunk_size, overlap)
+        self.db.commit()
+        partial = cache_path.with_suffix(".partial")
+        with open(partial, "w", encoding="utf-8") as f:
+            cursor.copy_expert(
+                f"COPY (SELECT {CHUNK_COPY_COLUMNS} FROM document_chunks ORDER BY id) TO STDOUT", f
+            )
+        partial.replace(cache_path)
+        return total_chunks
+
     def sample_chunks(self, n: int = 10) -> List[DocumentChunk]:
         """Randomly sample N chunks from the database."""
-        all_chunks = self.db.query(DocumentChunk).all()
-        return random.sample(all_chunks, min(n, len(all_chunks)))
+        # Sample over bare ids; only the chosen rows are loaded as ORM objects
+        ids = [chunk_id for (chunk_id,) in self.db.query(DocumentChunk.id)]
+        sampled_ids = random.sample(ids, min(n, len(ids)))
+        # Eager-load the parent document: callers read chunk.document.title from
+        # worker threads, where a lazy load per chunk would contend on the session
+        return (
+            self.db.query(DocumentChunk)
+            .options(joinedload(DocumentChunk.document))
+            .filter(DocumentChunk.id.in_(sampled_ids))
+            .all()
+        )
         
     def save_json(self, data, filename: str):
         """Save data to JSON file, extending if exists."""
         filepath = self.output_dir / filename
         
         if filepath.exists():
-            with open(filepath, "r") as f:
-                existing = json.load(f)
+            existing = self.load_json(filename)
             if isinstance(existing, list) and isinstance(data, list):
                 existing.extend(data)
                 data = existing
         
-        with open(filepath, "w") as f:
-            json.dump(data, f, indent=2)
+        filepath.write_bytes(_dumps(data, indent=True))
         print(f"Saved to {filepath}")
+
+    @contextmanager
+    def stream_json_list(self, filename: str):
+        """
+        Write a JSON list one record at a time. Yields an append(record) callable.
+        Records go to <filename>.partial as they arrive; the file is renamed into
+        place only once the list is complete, so a crash never leaves a truncated
+        file where a finished one is expected.
+        """
+        filepath = self.output_dir / filename
+        partial_path = filepath.with_name(filepath.name + ".partial")
+        written = 0
+
+        with open(partial_path, "wb") as f:
+            f.write(b"[\n")
+
+            def append(record):
+                nonlocal written
+                if written:
+                    f.write(b",\n")
+                f.write(_dumps(record))
+                f.flush()
+                written += 1
+
+            yield append
+            f.write(b"\n]\n")
+
+        partial_path.replace(filepath)
+        print(f"Saved {written} records to {filepath}")
         
     def load_json(self, filename: str) -> Dict:
         """Load data from JSON file."""
         filepath = self.output_dir / filename
         if not filepath.exists():
             raise FileNotFoundError(f"File not found: {filepath}")
-        with open(filepath, "r") as f:
-            return json.load(f)
+        return orjson.loads(filepath.read_bytes())
+
+    @staticmethod
+    def extract_json_object(text: str):
+        """Parse the outermost {...} in an LLM reply, ignoring code fences or chatter around it."""
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end < start:
+            raise ValueError("No JSON object in response")
+        return orjson.loads(text[start:end + 1])
         
     @abstractmethod
     def run(self):
@@ -5,13 +5,18 @@ Experiment: Embedding Model Benchmark (Auto-Resizing)
 
 import sys
 import json
+import hashlib
+import sqlite3
 import os
 import time
 import logging
 import re
 from pathlib import Path
 from typing import List, Dict, Any
+import numpy as np
 from sqlalchemy import text, inspect
+from psycopg2.extras import execute_values
+from rich.progress import track
 
 # --- Project Imports ---
 sys.path.append(str(Path(__file__).parent.parent))
@@ -26,9 +31,19 @@ LOG_FORMAT = "%(asctime)s | %(levelname)-8s | %(message)s"
 logging.basicConfig(level=logging.INFO, format=LOG_FORMAT, datefmt="%H:%M:%S")
 logger = logging.getLogger(__name__)
 
+EMBED_BATCH_SIZE = 64  # chunks per embed_batch request
+# False = exact search (sequential scan), e.g. to measure recall lost to the ANN index
+USE_HNSW_INDEX = True
+HNSW_EF_SEARCH = 100
+
 RESULTS_DIR = Path(__file__).parent / "results" / "chunking_quality"
 RESULTS_DIR.mkdir(parents=True, exist_ok=True)
 
+# Vectors per (model slug, text hash), so re-runs skip the embedding servers
+EMBEDDING_CACHE_PATH = RESULTS_DIR / ".embcache.sqlite"
+
+CHUNK_SIZE_RE = re.compile(r'(\d+)w')
+
 DATASETS = [
     RESULTS_DIR / "ground_truths_150w.json"
 ]
@@ -50,9 +65,90 @@ MODELS_TO_TEST = [
     }
 ]
 
+def _vector_literal(vector) -> str:
+    """pgvector text literal; 6 significant digits is below float32 noise and about half of repr()'s bytes."""
+    return "[" + ",".join(format(x, ".6g") for x in vector) + "]"
+
+
 class EmbeddingBenchmark:
     def __init__(self):
         self.db = SessionLocal()
+        self.embedding_cache = sqlite3.connect(EMBEDDING_CACHE_PATH)
+        self.embedding_cache.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (slug TEXT, text_hash TEXT, vector BLOB, PRIMARY KEY (slug, text_hash))"
+        )
+
+    def close(self):
+        self.embedding_cache.close()
+        self.db.close()
+
+    def _embed_batch_cached(self, texts: List[str], service, slug: str) -> List[np.ndarray]:
+        """embed_batch through the on-disk cache; only misses reach the provider."""
+        hashes = [hashlib.sha1(t.encode("utf-8")).hexdigest() for t in texts]
+        cached = {}
+        for text_hash, blob in self.embedding_cache.execute(
+            f"SELECT text_hash, vector FROM embeddings WHERE slug = ? AND text_hash IN ({','.join('?' * len(hashes))})",
+            [slug, *hashes],
+        ):
+            cached[text_hash] = np.frombuffer(blob, dtype=np.float32)
+
+        misses = [i for i, h in enumerate(hashes) if h not in cached]
+        if misses:
+            vectors = service.embed_batch([texts[i] for i in misses])
+            rows = [(slug, hashes[i], np.asarray(v, dtype=np.float32).tobytes()) for i, v in zip(misses, vectors)]
+            with self.embedding_cache:  # commits this batch, or rolls it back on error
+                self.embedding_cache.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)", rows)
+            cached.update((hashes[i], v) for i, v in zip(misses, vectors))
+
+        return [cached[h] for h in hashes]
+
+    def _resolve_chunk_contents(self, ground_truths: List[Dict]) -> List[Dict]:
+        """Fill in chunk_content for items that only carry the chunking experiment's content_hash.
+
+        Looks the hash up in the live document_chunks table first, then in the chunking
+        experiment's COPY dumps (chunks_*.copy) next to the dataset.
+        """
+        wanted = {item["content_hash"] for item in ground_truths if "chunk_content" not in item and "content_hash" in item}
+        found: Dict[str, str] = {}
+
+        def scan(rows):
+            for (content,) in rows:
+                # Same key as ChunkQualityExperiment._content_key
+                key = hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+                if key in wanted:
+                    found[key] = content
+
+        if wanted:
+            try:
+                scan(self.db.execute(text("SELECT content FROM document_chunks")))
+            except Exception:
+                self.db.rollback()
+            for dump in sorted(RESULTS_DIR.glob("chunks_*.copy")):
+                if len(found) == len(wanted):
+                    break
+                # Let Postgres decode the COPY text format; embedding stays text, its dimension doesn't matter here
+                self.db.execute(text(
+                    "CREATE TEMP TABLE IF NOT EXISTS gt_chunk_dump "
+                    "(document_id integer, chunk_index integer, content text, embedding text)"
+                ))
+                self.db.execute(text("TRUNCATE gt_chunk_dump"))
+                cursor = self.db.connection().connection.cursor()
+                with open(dump, "r", encoding="utf-8") as f:
+                    cursor.copy_expert("COPY gt_chunk_dump FROM STDIN", f)
+                scan(self.db.execute(text("SELECT content FROM gt_chunk_dump")))
+            self.db.commit()
+
+        resolved = []
+        for item in ground_truths:
+            if "chunk_content" not in item:
+                content = found.get(item.get("content_hash"))
+                if content is None:
+                    continue
+                item = {**item, "chunk_content": content}
+            resolved.append(item)
+        if len(resolved) < len(ground_truths):
+            logger.warning(f"⚠️ {len(ground_truths) - len(resolved)} ground truths had no matching chunk text and were skipped")
+        return resolved
 
     def _reset_embedding_singleton(self, config: Dict[str, Any]):
         """Forces a hard reset of the EmbeddingService configuration."""
@@ -129,7 +225,7 @@ class EmbeddingBenchmark:
             self.db.commit()
         return doc.id
 
-    def _index_chunks(self, chunks: List[str], doc_id: int, service):
+    def _index_chunks(self, chunks: List[str], doc_id: int, service, slug: str):
         """Embeds and inserts text chunks."""
         total = len(chunks)
         logger.info(f"📥 Indexing {total} chunks...")
@@ -139,44 +235,56 @@ class EmbeddingBenchmark:
         
         # We must use RAW SQL insert because the SQLAlchemy model 'DocumentChunk' 
         # is still bound to the old dimension (384) in Python memory.
-        insert_sql = text("""
+        insert_sql = """
             INSERT INTO document_chunks (document_id, chunk_index, content, embedding)
-            VALUES (:doc_id, :idx, :content, :emb)
-            RETURNING id
-        """)
+            VALUES %s
+            RETURNING id, content
+        """
 
-        for i, content in enumerate(chunks):
+        # rich redraws at a fixed rate instead of flushing stdout on every batch
+        batch_starts = range(0, total, EMBED_BATCH_SIZE)
+        for start in track(batch_starts, description="   Indexing", total=len(batch_starts), transient=True):
+            batch = chunks[start:start + EMBED_BATCH_SIZE]
             try:
-                vector = service.embed_text(content)
-                
-                # Execute Raw Insert
-                result = self.db.execute(insert_sql, {
-                    "doc_id": doc_id,
-                    "idx": i,
-                    "content": content,
-                    "emb": str(vector) # pgvector expects string or list
-                })
-                new_id = result.scalar()
-                content_id_map[content] = new_id
-
-                if (i + 1) % 20 == 0:
-                    self.db.commit()
-                    print(f"\r   ... Indexed {i+1}/{total}", end="", flush=True)
+                # One request per batch; TEI batches server-side
+                vectors = self._embed_batch_cached(batch, service, slug)
+
+                rows = [
+                    (doc_id, start + j, content, _vector_literal(vector))
+                    for j, (content, vector) in enumerate(zip(batch, vectors))
+                ]
+                # Single multi-row INSERT per batch (cursor taken per batch: commit releases the connection)
+                cursor = self.db.connection().connection.cursor()
+                # Throwaway benchmark rows: don't wait for the WAL flush on each batch commit
+                cursor.execute("SET LOCAL synchronous_commit = off")
+                inserted = execute_values(cursor, insert_sql, rows, page_size=200, fetch=True)
+                self.db.commit()
+                content_id_map.update((content, new_id) for new_id, content in inserted)
 
             except Exception as e:
                 self.db.rollback()
-                logger.warning(f"Failed chunk {i}: {e}")
+                logger.warning(f"Failed batch at chunk {start}: {e}")
 
         self.db.commit()
-        print("") # Newline
         
         duration = time.time() - start_time
         logger.info(f"✅ Indexing complete in {duration:.2f}s")
         return content_id_map
 
+    def _build_ann_index(self):
+        """Builds the HNSW index after the bulk load, which is much faster than maintaining it per insert."""
+        start_time = time.time()
+        self.db.execute(text(
+            "CREATE INDEX IF NOT EXISTS document_chunks_embedding_hnsw ON document_chunks "
+            "USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)"
+        ))
+        self.db.commit()
+        logger.info(f"🧭 Built HNSW index in {time.time() - start_time:.2f}s")
+
     def _check_keyword_match(self, retrieved_text: str, keywords: List[str]) -> tuple[List[str], bool]:
         if not keywords: return [], False
-        found = [kw for kw in keywords if kw.lower() in retrieved_text.lower()]
+        text_lower = retrieved_text.lower()
+        found = [kw for kw in keywords if kw.lower() in text_lower]
         is_match = len(found) >= (len(keywords) / 2)
         return found, is_match
 
@@ -187,18 +295,27 @@ class EmbeddingBenchmark:
             doc_id = self._prepare_parent_doc()
             
             unique_contents = list({item["chunk_content"] for item in ground_truths})
-            content_id_map = self._index_chunks(unique_contents, doc_id, service)
+            content_id_map = self._index_chunks(unique_contents, doc_id, service, config["slug"])
+            if USE_HNSW_INDEX:
+                self._build_ann_index()
 
             # 2. Retrieval
             logger.info("🔎 Starting Retrieval Benchmark (Raw SQL Mode)...")
             
             # We perform Raw SQL Search to bypass SQLAlchemy's class-level dimension check
             # This allows searching 768-dim vectors even if models.py says 384
+            # All questions go in one statement: each (qid, vector) pair probes the index
+            # through a LATERAL top-3, instead of one round-trip per question.
             search_sql = text("""
-                SELECT content 
-                FROM document_chunks 
-                ORDER BY embedding <=> :query_embedding 
-                LIMIT 3
+                SELECT q.qid, c.content
+                FROM unnest(CAST(:qids AS integer[]), CAST(:query_embeddings AS text[])) AS q(qid, v)
+                JOIN LATERAL (
+                    SELECT content, embedding <=> CAST(q.v AS vector) AS distance
+                    FROM document_chunks
+                    ORDER BY distance
+                    LIMIT 3
+                ) c ON true
+                ORDER BY q.qid, c.distance
             """)
             
             detailed_results = []
@@ -209,6 +326,28 @@ class EmbeddingBenchmark:
             valid_queries = [gt for gt in ground_truths if gt.get("chunk_content") in content_id_map]
             total_questions = len(valid_queries)
 
+            # Embed and search each distinct question once, in the same batches as indexing
+            unique_questions = list(dict.fromkeys(item["question"] for item in valid_queries))
+            q_vectors = []
+            for start in range(0, len(unique_questions), EMBED_BATCH_SIZE):
+                q_vectors.extend(self._embed_batch_cached(
+                    unique_questions[start:start + EMBED_BATCH_SIZE], service, config["slug"]
+                ))
+
+            # Execute Raw Search
+            # We cast to string because pgvector driver handles string->vector conversion 
+            # safer than object mapping when dimensions mismatch
+            retrieved_by_question = {question: [] for question in unique_questions}
+            if unique_questions:
+                if USE_HNSW_INDEX:
+                    self.db.execute(text(f"SET LOCAL hnsw.ef_search = {HNSW_EF_SEARCH}"))
+                rows = self.db.execute(search_sql, {
+                    "qids": list(range(len(unique_questions))),
+                    "query_embeddings": [_vector_literal(vector) for vector in q_vectors],
+                }).fetchall()
+                for qid, content in rows:
+                    retrieved_by_question[unique_questions[qid]].append(content)
+
             for i, item in enumerate(valid_queries):
                 question = item["question"]
                 target_content = item["chunk_content"]
@@ -216,16 +355,7 @@ class EmbeddingBenchmark:
                 keywords = item.get("keywords", [])
                 
                 try:
-                    # Embed Question
-                    q_vector = service.embed_text(question)
-
-                    # Execute Raw Search
-                    # We cast to string because pgvector driver handles string->vector conversion 
-                    # safer than object mapping when dimensions mismatch
-                    results = self.db.execute(search_sql, {"query_embedding": str(q_vector)}).fetchall()
-                    
-                    # Results are tuples: (content,)
-                    retrieved_contents = [row[0] for row in results]
+                    retrieved_contents = retrieved_by_question[question]
                     
                     # Map back to IDs
                     retrieved_ids = []
@@ -272,7 +402,7 @@ class EmbeddingBenchmark:
             mrr = sum(reciprocal_ranks) / len(reciprocal_ranks) if reciprocal_ranks else 0
             kw_accuracy = keyword_match_count / total_questions if total_questions else 0
 
-            chunk_size_match = re.search(r'(\d+)w', dataset_path.name)
+            chunk_size_match = CHUNK_SIZE_RE.search(dataset_path.name)
             chunk_size = int(chunk_size_match.group(1)) if chunk_size_match else 0
 
             return {
@@ -300,6 +430,8 @@ class EmbeddingBenchmark:
 
             with open(dataset_path, "r", encoding="utf-8") as f:
                 ground_truths = json.load(f)
+            # Before the first model run drops document_chunks
+            ground_truths = self._resolve_chunk_contents(ground_truths)
 
             for config in MODELS_TO_TEST:
                 logger.info(f"\n👉 DATASET: {dataset_path.name} | MODEL: {config['name']}")
@@ -322,8 +454,10 @@ class EmbeddingBenchmark:
 
 
 if __name__ == "__main__":
+    bench = EmbeddingBenchmark()
     try:
-        bench = EmbeddingBenchmark()
         bench.run()
     except KeyboardInterrupt:
         logger.warning("⚠️ Benchmark interrupted.")
+    finally:
+        bench.close()
@@ -1,6 +1,7 @@
 import json
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from urllib.parse import urlparse, unquote
 
 # === PATH SETUP ===
@@ -13,6 +14,9 @@ FILES = [
     "bilgi_pdfs_resumes.jsonl",
 ]
 
+# Rows per task handed to each worker process (amortizes pickling overhead)
+CHUNKSIZE = 256
+
 def detect_language_v3(text, title=""):
     if not text: return 'en'
     
@@ -107,63 +111,72 @@ def clean_text(text):
     if not text: return text
     return text.replace('\x00', '')
 
+def fix_row(line):
+    """Repairs one JSONL line. Returns (output_line, lang, title_fixed) or None to drop it."""
+    if not line.strip(): return None
+    try:
+        row = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+
+    # 1. Sanitize Content
+    row['content'] = clean_text(row.get('content', ''))
+    original_title = clean_text(row.get('title', ''))
+    
+    # 2. Fix Main Title
+    new_title = clean_title(row)
+    row['title'] = new_title
+
+    # 3. SYNC METADATA TITLE
+    if 'metadata' in row and isinstance(row['metadata'], dict):
+        row['metadata']['title'] = new_title
+    
+    # 4. Language Detect
+    sample_text = row['content'][:3000] 
+    lang = detect_language_v3(sample_text, new_title)
+    row['language'] = lang
+
+    return json.dumps(row, ensure_ascii=False) + "\n", lang, new_title != original_title
+
 def run_fix():
     print(f"📂 Scanning files in: {DATA_DIR}")
     
-    for filename in FILES:
-        filepath = os.path.join(DATA_DIR, filename)
-        temp_filepath = os.path.join(DATA_DIR, f"{filename}.tmp")
-        
-        if not os.path.exists(filepath):
-            print(f"⚠️  File not found: {filename}")
-            continue
-
-        print(f"🔧 Repairing Metadata for: {filename}...")
-        
-        stats = {"tr": 0, "en": 0, "titles_fixed": 0}
-        
-        with open(filepath, 'r', encoding='utf-8') as infile, \
-             open(temp_filepath, 'w', encoding='utf-8') as outfile:
+    # Title cleanup + language detection is pure CPU work: spread rows over all cores.
+    # map() keeps the original line order in the output file.
+    with ProcessPoolExecutor() as executor:
+        for filename in FILES:
+            filepath = os.path.join(DATA_DIR, filename)
+            temp_filepath = os.path.join(DATA_DIR, f"{filename}.tmp")
             
-            for line in infile:
-                if not line.strip(): continue
-                try:
-                    row = json.loads(line)
-                    
-                    # 1. Sanitize Content
-                    row['content'] = clean_text(row.get('content', ''))
-                    original_title = clean_text(row.get('title', ''))
-                    
-                    # 2. Fix Main Title
-                    new_title = clean_title(row)
-                    row['title'] = new_title
+            if not os.path.exists(filepath):
+                print(f"⚠️  File not found: {filename}")
+                continue
 
-                    # 3. SYNC METADATA TITLE
-                    if 'metadata' in row and isinstance(row['metadata'], dict):
-                        row['metadata']['title'] = new_title
-                    
-                    if new_title != original_title:
-                        stats["titles_fixed"] += 1
-                    
-                    # 4. Language Detect
-                    sample_text = row['content'][:3000] 
-                    lang = detect_language_v3(sample_text, new_title)
-                    row['language'] = lang
+            print(f"🔧 Repairing Metadata for: {filename}...")
+            
+            stats = {"tr": 0, "en": 0, "titles_fixed": 0}
+            
+            with open(filepath, 'r', encoding='utf-8') as infile, \
+                 open(temp_filepath, 'w', encoding='utf-8') as outfile:
+                
+                for result in executor.map(fix_row, infile, chunksize=CHUNKSIZE):
+                    if result is None: continue
+                    out_line, lang, title_fixed = result
                     
                     stats[lang] += 1
+                    if title_fixed:
+                        stats["titles_fixed"] += 1
                     
-                    outfile.write(json.dumps(row, ensure_ascii=False) + "\n")
-                    
-                except json.JSONDecodeError: continue
-        
-        os.replace(temp_filepath, filepath)
-        
-        print(f"   ✅ Complete.")
-        print(f"      - EN Docs: {stats['en']}")
-        print(f"      - TR Docs: {stats['tr']}")
-        print(f"      - Titles Repaired: {stats['titles_fixed']}")
+                    outfile.write(out_line)
+            
+            os.replace(temp_filepath, filepath)
+            
+            print(f"   ✅ Complete.")
+            print(f"      - EN Docs: {stats['en']}")
+            print(f"      - TR Docs: {stats['tr']}")
+            print(f"      - Titles Repaired: {stats['titles_fixed']}")
 
     print("\n🎉 Metadata repair finished.")
 
 if __name__ == "__main__":
-    run_fix()
\ No newline at end of file
+    run_fix()
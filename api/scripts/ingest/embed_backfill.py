@@ -32,7 +32,7 @@ from dotenv import load_dotenv
 _env_file = os.path.join(os.path.dirname(__file__), os.pardir, ".env")
 load_dotenv(_env_file)
 
-from sqlalchemy import func, select
+from sqlalchemy import func, select, update
 from database.session import SessionLocal
 from database.models import Course, UniversityDocument, DocumentChunk
 from services.embedding_service import get_embedding_service
@@ -177,22 +177,25 @@ def backfill_chunks(batch_size: int = 32) -> int:
         done = 0
 
         while True:
-            rows = (
-                db.query(DocumentChunk)
-                .filter(DocumentChunk.embedding.is_(None))
+            # Plain (id, content) rows: no ORM objects to track or flush one by one
+            rows = db.execute(
+                select(DocumentChunk.id, DocumentChunk.content)
+                .where(DocumentChunk.embedding.is_(None))
                 .order_by(DocumentChunk.id)
                 .limit(batch_size)
-                .all()
-            )
+            ).all()
             if not rows:
                 break
 
-            texts = [_truncate(r.content) for r in rows]
-            valid = [(r, t) for r, t in zip(rows, texts) if t and t.strip()]
+            texts = [_truncate(content) for _, content in rows]
+            valid = [(chunk_id, t) for (chunk_id, _), t in zip(rows, texts) if t and t.strip()]
             if valid:
                 embeddings = svc.embed_batch([t for _, t in valid])
-                for (row, _), emb in zip(valid, embeddings):
-                    row.embedding = emb
+                # ORM bulk UPDATE by primary key: one executemany for the whole batch
+                db.execute(
+                    update(DocumentChunk),
+                    [{"id": chunk_id, "embedding": emb} for (chunk_id, _), emb in zip(valid, embeddings)],
+                )
 
             db.commit()
             done += len(rows)
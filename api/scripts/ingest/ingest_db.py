@@ -14,11 +14,12 @@ import json
 import os
 import sys
 import hashlib
+import io
 import random
 import textwrap
 from datetime import datetime, date, timedelta
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional
 
 # Force unbuffered output so logs show immediately
 sys.stdout.reconfigure(line_buffering=True)
@@ -29,7 +30,8 @@ from dotenv import load_dotenv
 # Load .env BEFORE any database imports so DATABASE_URL is picked up
 load_dotenv(Path(__file__).resolve().parent.parent / ".env")
 
-from sqlalchemy import text
+from sqlalchemy import insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
 # ── Project imports ─────────────────────────────────────────────────────────
@@ -162,6 +164,49 @@ def _build_course_description(row: dict) -> str:
     return "\n".join(parts)
 
 
+def _copy_value(value: Any) -> str:
+    """Encode one value for COPY ... FROM STDIN (FORMAT text)."""
+    if value is None:
+        return r"\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+        .replace("\x00", "")  # NUL crashes PostgreSQL text columns
+    )
+
+
+def _copy_rows(session: Session, table: str, columns: List[str], rows: Iterable[tuple]) -> None:
+    """
+    Stream rows into `table` with COPY FROM STDIN on the session's own
+    connection (same transaction), skipping per-row INSERT parsing.
+    """
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join(_copy_value(v) for v in row))
+        buf.write("\n")
+    buf.seek(0)
+
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT text)", buf
+        )
+    finally:
+        cursor.close()
+
+
+def _existing_keys(session: Session, column: Any, keys: Iterable[str]) -> set:
+    """
+    Return the subset of `keys` already stored in the unique `column`, with
+    one IN query instead of one lookup per input row. Shared by every ingest
+    step so the skip-existing logic lives in one place.
+    """
+    return set(session.scalars(select(column).where(column.in_(set(keys)))))
+
+
 # ============================================================================
 # Ingest: Courses
 # ============================================================================
@@ -176,9 +221,15 @@ def ingest_courses(session: Session) -> int:
     total = len(rows)
     print(f"  📖 Read {total} course records from {COURSES_FILE.name}")
 
-    inserted = 0
+    course_rows: List[Dict[str, Any]] = []
+    topics_by_code: Dict[str, List[tuple]] = {}
     skipped = 0
 
+    existing_codes = _existing_keys(
+        session, Course.code,
+        ((row.get("metadata", {}).get("course_code") or "").strip() for row in rows),
+    )
+
     for i, row in enumerate(rows, 1):
         if i % 500 == 0 or i == total:
             print(f"    ... processing course {i}/{total}", flush=True)
@@ -190,39 +241,50 @@ def ingest_courses(session: Session) -> int:
             skipped += 1
             continue
 
-        # Upsert-like: skip if code already exists
-        existing = session.query(Course).filter_by(code=code).first()
-        if existing:
+        # Upsert-like: skip if code already exists (in the DB or earlier in this file)
+        if code in topics_by_code or code in existing_codes:
             skipped += 1
             continue
 
         description = _build_course_description(row)
         keywords = _extract_keywords_from_course(meta)
 
-        course = Course(
-            code=code,
-            name=name,
-            description=description[:500] if description else None,
-            keywords=keywords,
+        course_rows.append({
+            "code": code,
+            "name": name,
+            "description": description[:500] if description else None,
+            "keywords": keywords,
             # embedding left NULL — backfill later
-        )
-        session.add(course)
-        session.flush()  # get course.id
-
-        # Weekly topics → course_content
-        weekly_topics = meta.get("weekly_topics", [])
-        for week_num, topic in enumerate(weekly_topics, 1):
-            if topic and topic.strip():
-                cc = CourseContent(
-                    course_id=course.id,
-                    week_number=week_num,
-                    topic=topic.strip(),
-                )
-                session.add(cc)
-
-        inserted += 1
-
-    session.commit()
+        })
+
+        # Weekly topics → course_content (week number keeps its position in the list)
+        topics_by_code[code] = [
+            (week_num, topic.strip())
+            for week_num, topic in enumerate(meta.get("weekly_topics", []), 1)
+            if topic and topic.strip()
+        ]
+
+    # One multi-row INSERT for all courses, then one for all weekly topics.
+    # ON CONFLICT covers codes inserted concurrently since the lookup above:
+    # they return no id and are skipped along with their topics.
+    inserted_ids = []
+    if course_rows:
+        inserted_ids = session.execute(
+            pg_insert(Course)
+            .on_conflict_do_nothing(index_elements=[Course.code])
+            .returning(Course.id, Course.code),
+            course_rows,
+        ).all()
+        content_rows = [
+            {"course_id": course_id, "week_number": week_num, "topic": topic}
+            for course_id, code in inserted_ids
+            for week_num, topic in topics_by_code[code]
+        ]
+        if content_rows:
+            session.execute(insert(CourseContent), content_rows)
+
+    inserted = len(inserted_ids)
+    skipped += len(course_rows) - inserted
     print(f"  ✅ Courses: {inserted} inserted, {skipped} skipped")
     return inserted
 
@@ -241,10 +303,16 @@ def ingest_unidata(session: Session) -> int:
     total = len(rows)
     print(f"  📖 Read {total} document records from {UNIDATA_FILE.name}")
 
-    inserted = 0
+    doc_rows: List[tuple] = []
+    chunks_by_url: Dict[str, List[str]] = {}
     skipped = 0
     total_chunks = 0
 
+    existing_urls = _existing_keys(
+        session, UniversityDocument.source_url,
+        ((row.get("url") or "").strip() for row in rows),
+    )
+
     for i, row in enumerate(rows, 1):
         if i % 1000 == 0 or i == total:
             print(f"    ... processing doc {i}/{total} ({total_chunks} chunks so far)", flush=True)
@@ -256,40 +324,63 @@ def ingest_unidata(session: Session) -> int:
             skipped += 1
             continue
 
-        # Skip duplicates
-        existing = session.query(UniversityDocument).filter_by(source_url=url).first()
-        if existing:
+        # Skip duplicates (in the DB or earlier in this file)
+        if url in chunks_by_url or url in existing_urls:
             skipped += 1
             continue
 
         keywords = _extract_keywords_from_page(row)
 
-        doc = UniversityDocument(
-            source_url=url,
-            title=title,
-            raw_content=content,
-            summary=content[:500] if content else None,
-            keywords=keywords,
+        doc_rows.append((
+            url,
+            title,
+            content,
+            content[:500] if content else None,
+            keywords,
             # keyword_embedding left NULL — backfill later
-        )
-        session.add(doc)
-        session.flush()
+        ))
 
         # Chunk the content
-        chunks = _chunk_text(content)
-        for idx, chunk_text in enumerate(chunks):
-            dc = DocumentChunk(
-                document_id=doc.id,
-                chunk_index=idx,
-                content=chunk_text,
-                # embedding left NULL — backfill later
-            )
-            session.add(dc)
-            total_chunks += 1
-
-        inserted += 1
-
-    session.commit()
+        chunks_by_url[url] = _chunk_text(content)
+        total_chunks += len(chunks_by_url[url])
+
+    # Large raw_content goes through COPY into a staging table, then a single
+    # INSERT ... ON CONFLICT DO NOTHING RETURNING moves it over: URLs inserted
+    # concurrently since the lookup above are skipped instead of failing the load.
+    inserted_ids = []
+    if doc_rows:
+        session.execute(text(
+            "CREATE TEMP TABLE staged_documents "
+            "(source_url TEXT, title TEXT, raw_content TEXT, summary TEXT, keywords TEXT) "
+            "ON COMMIT DROP"
+        ))
+        _copy_rows(
+            session,
+            "staged_documents",
+            ["source_url", "title", "raw_content", "summary", "keywords"],
+            doc_rows,
+        )
+        inserted_ids = session.execute(text(
+            "INSERT INTO university_documents (source_url, title, raw_content, summary, keywords) "
+            "SELECT source_url, title, raw_content, summary, keywords FROM staged_documents "
+            "ON CONFLICT (source_url) DO NOTHING "
+            "RETURNING id, source_url"
+        )).all()
+        _copy_rows(
+            session,
+            "document_chunks",
+            ["document_id", "chunk_index", "content"],
+            # embedding left NULL — backfill later
+            (
+                (doc_id, idx, chunk_text)
+                for doc_id, url in inserted_ids
+                for idx, chunk_text in enumerate(chunks_by_url[url])
+            ),
+        )
+
+    inserted = len(inserted_ids)
+    skipped += len(doc_rows) - inserted
+    total_chunks = sum(len(chunks_by_url[url]) for _, url in inserted_ids)
     print(f"  ✅ Documents: {inserted} inserted, {skipped} skipped ({total_chunks} chunks)")
     return inserted
 
@@ -473,7 +564,6 @@ def seed_sis_data(session: Session):
         if section_count % 500 == 0 and section_count > 0:
             session.flush()
 
-    session.commit()
     print(f"  ✅ {section_count} course sections created")
 
     # ── Summary ─────────────────────────────────────────────────────────
@@ -510,6 +600,11 @@ def main():
     session = SessionLocal()
 
     try:
+        # The whole load is one transaction, committed once at the end. Skipping
+        # the WAL fsync wait is safe for a re-runnable bulk load: a crash can lose
+        # only the last commit, never corrupt data. Not for OLTP sessions.
+        session.execute(text("SET LOCAL synchronous_commit = OFF"))
+
         # ── Ingest course data ──────────────────────────────────────────
         print("\n📥 Ingesting courses ...")
         n_courses = ingest_courses(session)
@@ -541,6 +636,8 @@ def main():
             print(f"  Course sections:     {n_sect}")
             print(f"  Academic terms:      {n_terms}")
         print("=" * 60)
+
+        session.commit()
         print("✅ Ingestion complete!")
         print(
             "\n💡 Next: backfill embeddings with:\n"
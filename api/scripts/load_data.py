@@ -1,8 +1,8 @@
 import sys
 import os
+import io
 import json
 import psycopg2
-from psycopg2.extras import Json
 from dotenv import load_dotenv
 from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeRemainingColumn, MofNCompleteColumn
 
@@ -32,6 +32,9 @@ FILES = [
 CHUNK_SIZE = 150
 CHUNK_OVERLAP = 30
 
+COPY_COLUMNS = "url, title, content, language, type, metadata"
+COPY_BATCH_SIZE = 1000
+
 def get_db_connection():
     try:
         conn = psycopg2.connect(**DB_PARAMS)
@@ -67,7 +70,7 @@ def setup_database(conn):
                 language VARCHAR(10),
                 type VARCHAR(50),
                 metadata JSONB DEFAULT '{}'::jsonb,
-                embedding vector(384),
+                embedding halfvec(384),
                 created_at TIMESTAMP DEFAULT NOW()
             );
         """)
@@ -103,6 +106,25 @@ def clean_text(text):
         return text
     return text.replace('\x00', '')
 
+def copy_field(value):
+    """Encodes one value for COPY ... FROM STDIN (FORMAT text)."""
+    if value is None:
+        return r'\N'
+    return (clean_text(str(value))
+            .replace('\\', '\\\\')
+            .replace('\t', '\\t')
+            .replace('\n', '\\n')
+            .replace('\r', '\\r'))
+
+def copy_batch(cursor, batch_data):
+    """Streams a batch into knowledge_base with COPY instead of per-row INSERTs."""
+    buf = io.StringIO()
+    for row in batch_data:
+        buf.write('\t'.join(copy_field(v) for v in row))
+        buf.write('\n')
+    buf.seek(0)
+    cursor.copy_expert(f"COPY knowledge_base ({COPY_COLUMNS}) FROM STDIN WITH (FORMAT text)", buf)
+
 def process_file(conn, filename):
     filepath = os.path.join(DATA_DIR, filename)
     if not os.path.exists(filepath):
@@ -117,11 +139,6 @@ def process_file(conn, filename):
     cursor = conn.cursor()
     batch_data = []
     
-    insert_query = """
-        INSERT INTO knowledge_base (url, title, content, language, type, metadata)
-        VALUES (%s, %s, %s, %s, %s, %s)
-    """
-
     # 2. Rich Progress Bar Context
     with Progress(
         SpinnerColumn(),
@@ -147,7 +164,7 @@ def process_file(conn, filename):
                             row['content'],
                             row['language'],
                             'course',
-                            Json(row['metadata'])
+                            json.dumps(row['metadata'], ensure_ascii=False)
                         ))
 
                     # --- WEB PAGE & PDF LOGIC ---
@@ -178,12 +195,12 @@ def process_file(conn, filename):
                                 chunk_text,
                                 row.get('language', 'en'),
                                 doc_type,
-                                Json(meta)
+                                json.dumps(meta, ensure_ascii=False)
                             ))
 
                     # Batch Insert
-                    if len(batch_data) >= 100:
-                        cursor.executemany(insert_query, batch_data)
+                    if len(batch_data) >= COPY_BATCH_SIZE:
+                        copy_batch(cursor, batch_data)
                         conn.commit()
                         batch_data = []
                     
@@ -199,7 +216,7 @@ def process_file(conn, filename):
 
     # Flush remaining batch
     if batch_data:
-        cursor.executemany(insert_query, batch_data)
+        copy_batch(cursor, batch_data)
         conn.commit()
     
     print(f"✅ Loaded {filename} successfully.")
@@ -0,0 +1,19 @@
+-- Store knowledge_base and document keyword embeddings as fp16 halfvec (pgvector >= 0.7),
+-- the same as courses and document_chunks in 003. knowledge_base backs every /ask
+-- retrieval, so this is where the halved index size and bandwidth pay off most.
+-- 384 matches the default EMBEDDING_DIM; change all four occurrences if yours differs.
+
+-- HNSW indexes are bound to the column type, rebuild them after the change
+DROP INDEX IF EXISTS knowledge_base_embedding_hnsw;
+DROP INDEX IF EXISTS university_documents_keyword_embedding_hnsw;
+
+ALTER TABLE knowledge_base
+    ALTER COLUMN embedding TYPE halfvec(384) USING embedding::halfvec(384);
+
+ALTER TABLE university_documents
+    ALTER COLUMN keyword_embedding TYPE halfvec(384) USING keyword_embedding::halfvec(384);
+
+CREATE INDEX IF NOT EXISTS knowledge_base_embedding_hnsw
+    ON knowledge_base USING hnsw (embedding halfvec_l2_ops) WITH (m = 16, ef_construction = 64);
+CREATE INDEX IF NOT EXISTS university_documents_keyword_embedding_hnsw
+    ON university_documents USING hnsw (keyword_embedding halfvec_cosine_ops) WITH (m = 16, ef_construction = 64);
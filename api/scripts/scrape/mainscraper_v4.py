@@ -10,9 +10,17 @@ import re
 import os
 import signal
 import sys
+from collections import deque
 from urllib.parse import urljoin, urlparse
 from datetime import datetime
 
+# lxml is a C parser, several times faster than the pure-Python html.parser
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
 # --- CONFIGURATION ---
 START_URLS = ["https://www.bilgi.edu.tr/tr/", "https://www.bilgi.edu.tr/en/"]
 ALLOWED_DOMAIN = "www.bilgi.edu.tr"
@@ -41,6 +49,8 @@ url_lock = threading.Lock()
 file_lock = threading.Lock()
 shutdown_event = threading.Event() # For graceful exit
 
+_INLINE_WS_RE = re.compile(r"[ \t\xa0]+")
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 }
@@ -97,30 +107,25 @@ def parse_page(url, session):
     if shutdown_event.is_set(): return [] # Stop if Ctrl+C was pressed
 
     try:
-        # 1. HEAD REQUEST
-        try:
-            head_resp = session.head(url, headers=HEADERS, timeout=5, allow_redirects=True)
-            if 'text/html' not in head_resp.headers.get('Content-Type', ''):
-                return []
-        except:
-            pass
-
-        # 2. GET REQUEST
+        # 1. GET REQUEST (streamed: headers arrive before the body, so
+        #    PDFs/images are dropped without downloading them or a HEAD round-trip)
         time.sleep(random.uniform(*REQUEST_DELAY))
-        response = session.get(url, headers=HEADERS, timeout=10)
-        if response.status_code != 200: return []
+        with session.get(url, headers=HEADERS, timeout=10, stream=True) as response:
+            if response.status_code != 200: return []
+            if 'text/html' not in response.headers.get('Content-Type', ''):
+                return []
+            soup = BeautifulSoup(response.content, HTML_PARSER)
 
-        soup = BeautifulSoup(response.content, 'html.parser')
         new_links = []
 
-        # 3. HARVEST LINKS
+        # 2. HARVEST LINKS
         for a_tag in soup.find_all('a', href=True):
             href = a_tag['href'].split('#')[0].split('?')[0]
             full_link = urljoin(url, href)
             if is_valid_url(full_link):
                 new_links.append(full_link)
 
-        # 4. SAVE CONTENT
+        # 3. SAVE CONTENT
         is_homepage = "is-homepage" in soup.body.get('class', [])
         if not is_homepage:
             data = extract_page_data(soup, url)
@@ -147,7 +152,7 @@ def extract_page_data(soup, url):
     for tag in content_area.select('nav, footer, .site-header, .sidebar, .widget, script, style, .cookie-warning, .modal'):
         tag.decompose()
         
-    main_text = content_area.get_text(separator='\n', strip=True)
+    main_text = _INLINE_WS_RE.sub(' ', content_area.get_text(separator='\n', strip=True))
     if len(main_text) < 100: return None 
 
     breadcrumbs = []
@@ -187,37 +192,36 @@ def save_data(data):
 
 def crawl_bfs():
     load_state()
-    queue = []
-    for start_url in START_URLS:
-        if start_url not in visited_urls:
-            queue.append(start_url)
+    queue = deque(url for url in START_URLS if url not in visited_urls)
     
-    if not queue: queue = START_URLS.copy()
-
-    with requests.Session() as session:
-        while queue and not shutdown_event.is_set():
-            current_batch = []
-            with url_lock:
-                while queue and len(current_batch) < MAX_THREADS:
-                    url = queue.pop(0)
-                    if url not in visited_urls:
-                        visited_urls.add(url) 
-                        with open(STATE_FILE, 'a', encoding='utf-8') as f:
-                            f.write(url + '\n')
-                        current_batch.append(url)
+    if not queue: queue = deque(START_URLS)
+
+    # One long-lived pool with a rolling window of in-flight pages: a slow page
+    # no longer holds back the rest of its batch before new URLs are dispatched.
+    with requests.Session() as session, \
+            concurrent.futures.ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
+        in_flight = set()
+        while (queue or in_flight) and not shutdown_event.is_set():
+            while queue and len(in_flight) < MAX_THREADS:
+                url = queue.popleft()
+                with url_lock:
+                    if url in visited_urls: continue
+                    visited_urls.add(url)
+                    with open(STATE_FILE, 'a', encoding='utf-8') as f:
+                        f.write(url + '\n')
+                in_flight.add(executor.submit(parse_page, url, session))
             
-            if not current_batch: break
-
-            with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
-                future_to_url = {executor.submit(parse_page, url, session): url for url in current_batch}
-                for future in concurrent.futures.as_completed(future_to_url):
-                    links = future.result()
-                    if links:
-                        for link in links:
-                            if link not in visited_urls:
-                                queue.append(link)
+            if not in_flight: break
+
+            done, in_flight = concurrent.futures.wait(
+                in_flight, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                for link in future.result():
+                    if link not in visited_urls:
+                        queue.append(link)
             
-            print(f"Queue: {len(queue)} | Processed: {len(visited_urls)}")
+            print(f"Queue: {len(queue)} | In flight: {len(in_flight)} | Processed: {len(visited_urls)}")
 
     print("Scraper stopped.")
 
@@ -8,6 +8,13 @@ import concurrent.futures
 import os
 from datetime import datetime
 
+# lxml is a C parser, several times faster than the pure-Python html.parser
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
 # --- CONFIGURATION ---
 BASE_URL = "https://ects.bilgi.edu.tr"
 OUTPUT_FILE = "scraped_courses_2025-2026.jsonl"
@@ -45,7 +52,7 @@ def get_soup(session, url):
     try:
         response = session.get(url, timeout=20)
         if response.status_code in [403, 429]: return None 
-        return BeautifulSoup(response.content, 'html.parser')
+        return BeautifulSoup(response.content, HTML_PARSER)
     except: return None
 
 def clean_text(text):
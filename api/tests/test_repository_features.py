@@ -204,6 +204,19 @@ class TestCourseRepository:
         assert course is not None
         assert course.name == "Intro to Programming"
 
+    def test_vector_search_returns_hits_by_distance(self, db_session, sample_courses):
+        """Test vector search pairs each course with its distance, nearest first"""
+        dim = models.EMBEDDING_DIM
+        sample_courses['cs101'].embedding = [1.0] + [0.0] * (dim - 1)
+        sample_courses['cs102'].embedding = [0.0, 1.0] + [0.0] * (dim - 2)
+        db_session.commit()
+
+        repo = CourseRepository()
+        hits = repo.vector_search(db_session, [1.0] + [0.0] * (dim - 1), limit=2)
+
+        assert [hit.course.code for hit in hits] == ["CS101", "CS102"]
+        assert hits[0].distance < hits[1].distance
+
 
 # ============================================================================
 # TERM REPOSITORY TESTS
@@ -1,3 +1,4 @@
+import asyncio
 import json
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
@@ -78,6 +79,86 @@ def test_ask_streams_courses_chunks_done(monkeypatch):
     assert events[3] == {"type": "done"}
 
 
+def test_ask_coalesced_stream_keeps_sse_framing(monkeypatch):
+    tokens = [f"tok{i} " for i in range(100)]
+
+    class _ManyTokensRAG(_FakeRAG):
+        def stream_answer(self, q, _db, limit):
+            return iter(tokens), []
+
+    monkeypatch.setattr(search_routes, "rag", _ManyTokensRAG())
+    client = TestClient(_app())
+    res = client.get("/api/ask", params={"q": "oop"})
+    assert res.status_code == 200
+    events = [json.loads(line.removeprefix("data: ")) for line in res.text.split("\n\n") if line]
+    assert events[0]["type"] == "courses"
+    assert [event["text"] for event in events[1:-1]] == tokens
+    assert events[-1] == {"type": "done"}
+
+
+def test_coalesce_flushes_buffered_tokens_before_the_next_one_arrives():
+    async def slow_tokens():
+        for token in ("a", "b", "c"):
+            yield token
+        await asyncio.sleep(search_routes.SSE_FLUSH_SECONDS * 10)
+        yield "d"
+
+    async def collect():
+        return [data async for data in search_routes._coalesce(slow_tokens())]
+
+    batches = asyncio.run(collect())
+    # first token alone, b+c on the deadline (not held back until d), then d on close
+    assert [batch.count(b"data: ") for batch in batches] == [1, 2, 1]
+    assert b"".join(batches).count(b'"type":"chunk"') == 4
+
+
+def test_coalesce_closes_source_when_consumer_stops():
+    closed = []
+
+    async def endless_tokens():
+        try:
+            while True:
+                yield "tok"
+                await asyncio.sleep(0)
+        finally:
+            closed.append(True)
+
+    async def read_then_disconnect():
+        batches = search_routes._coalesce(endless_tokens())
+        await anext(batches)
+        await batches.aclose()
+
+    asyncio.run(read_then_disconnect())
+    assert closed == [True]
+
+
+def test_ask_closes_llm_stream_on_disconnect(monkeypatch):
+    closed = []
+
+    class _EndlessRAG(_FakeRAG):
+        def stream_answer(self, q, _db, limit):
+            def _gen():
+                try:
+                    while True:
+                        yield "tok"
+                finally:
+                    closed.append(True)
+
+            return _gen(), []
+
+    monkeypatch.setattr(search_routes, "rag", _EndlessRAG())
+
+    async def read_then_disconnect():
+        response = await search_routes.ask_courses(q="oop", limit=2, db=object(), _current_user=None)
+        body = response.body_iterator
+        assert b'"type":"courses"' in await anext(body)
+        assert b'"type":"chunk"' in await anext(body)
+        await body.aclose()
+
+    asyncio.run(read_then_disconnect())
+    assert closed == [True]
+
+
 def test_search_requires_auth():
     app = FastAPI()
     app.include_router(search_routes.router, prefix="/api")
@@ -0,0 +1,60 @@
+from rag import search_cache
+from rag.search_cache import TTLCache, normalize_query
+
+
+def test_normalize_query_folds_case_and_whitespace():
+    assert normalize_query("  Data   STRUCTURES\tand\nAlgorithms ") == "data structures and algorithms"
+    assert normalize_query("OOP") == normalize_query("oop ")
+    assert normalize_query("   ") == ""
+
+
+def test_get_returns_value_until_ttl_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(search_cache.time, "monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=4, ttl_seconds=10)
+
+    cache.set("q", ("hit",))
+    now[0] += 9.9
+    assert cache.get("q") == ("hit",)
+
+    now[0] += 0.2
+    assert cache.get("q") is None
+    # expired entries are evicted, not just hidden
+    now[0] -= 5
+    assert cache.get("q") is None
+
+
+def test_evicts_least_recently_used_at_maxsize():
+    cache = TTLCache(maxsize=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_set_overwrites_and_refreshes_entry():
+    cache = TTLCache(maxsize=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("a", 10)
+
+    cache.set("c", 3)
+
+    assert cache.get("a") == 10
+    assert cache.get("b") is None
+
+
+def test_zero_maxsize_disables_cache_and_clear_empties_it():
+    disabled = TTLCache(maxsize=0, ttl_seconds=60)
+    disabled.set("a", 1)
+    assert disabled.get("a") is None
+
+    cache = TTLCache(maxsize=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.clear()
+    assert cache.get("a") is None